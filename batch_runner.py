@@ -0,0 +1,140 @@
+"""
+----------------------------------------------------------------------
+Project: Penman Evaporation Calculator
+Filename: batch_runner
+Author: Roy Elkayam
+Created: 2026-10-17
+Description: Runs the evaporation pipeline for many station files on a process pool
+----------------------------------------------------------------------
+"""
+
+import argparse
+import glob
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import pandas as pd
+from penman_calculation import PenmanEvaporation
+from pipeline import RESULT_COLUMNS, run_pipeline
+
+
+def load_station_metadata(path):
+    """
+    Load per-station metadata from a CSV with 'station', 'latitude', 'elevation' and 'albedo' columns.
+
+    Args:
+        path (str): Path of the metadata CSV
+
+    Returns:
+        dict: Station name -> {'latitude': ..., 'elevation': ..., 'albedo': ...}
+    """
+    metadata = pd.read_csv(path, dtype={'station': str}).set_index('station')
+    return metadata[['latitude', 'elevation', 'albedo']].to_dict(orient='index')
+
+
+def run_batch(inputs, stations, output_dir, max_workers=None, chunksize=500_000):
+    """
+    Compute daily evaporation for many station files in parallel, one result file per station.
+
+    Each input file is named after its station (e.g. 'data/soreq.csv' -> station 'soreq'), and
+    its metadata is looked up in `stations`. Files are spread across a process pool; a failing
+    station is recorded in the summary and does not stop the others.
+
+    Args:
+        inputs (str or list): Glob pattern or list of raw IMS CSV paths
+        stations (dict): Station name -> {'latitude': ..., 'elevation': ..., 'albedo': ...}
+        output_dir (str): Directory for the '<station>_evaporation.csv' result files
+        max_workers (int, optional): Number of worker processes (default: CPU count)
+        chunksize (int): Number of raw rows read per chunk
+
+    Returns:
+        pandas.DataFrame: Summary with one row per station (status, days, seconds, days/s, error)
+    """
+    paths = sorted(glob.glob(inputs)) if isinstance(inputs, str) else list(inputs)
+    os.makedirs(output_dir, exist_ok=True)
+
+    rows = []
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        futures = {}
+        for path in paths:
+            station = _station_name(path)
+            output_path = os.path.join(output_dir, f'{station}_evaporation.csv')
+            future = executor.submit(_process_station, path, stations.get(station), output_path, chunksize)
+            futures[future] = (station, path)
+
+        for future in as_completed(futures):
+            station, path = futures[future]
+            try:
+                rows.append({'station': station, 'path': path, 'status': 'ok', **future.result()})
+            except Exception as exc:
+                rows.append({'station': station, 'path': path, 'status': 'failed', 'error': repr(exc)})
+
+    summary = pd.DataFrame(rows, columns=['station', 'path', 'status', 'n_days', 'seconds',
+                                          'days_per_second', 'output_path', 'error'])
+    return summary.sort_values('station', ignore_index=True)
+
+
+def _process_station(path, metadata, output_path, chunksize):
+    """
+    Worker: run the fused pipeline on one station file and write its result file.
+
+    Args:
+        path (str): Raw IMS CSV path
+        metadata (dict): Station latitude, elevation and albedo
+        output_path (str): Result CSV path
+        chunksize (int): Number of raw rows read per chunk
+
+    Returns:
+        dict: Timing and size of the run
+    """
+    if metadata is None:
+        raise KeyError(f"No station metadata for '{_station_name(path)}'")
+
+    start = time.perf_counter()
+    penman = PenmanEvaporation(latitude_deg=metadata['latitude'], elevation=metadata.get('elevation', 0),
+                               albedo=metadata.get('albedo', 0.08))
+    daily_df = run_pipeline(path, penman, output_columns=RESULT_COLUMNS, chunksize=chunksize)
+    daily_df.to_csv(output_path)
+    seconds = time.perf_counter() - start
+
+    return {'n_days': len(daily_df), 'seconds': seconds,
+            'days_per_second': len(daily_df) / seconds if seconds > 0 else float('nan'),
+            'output_path': output_path}
+
+
+def _station_name(path):
+    """Station name of an input file: its file name without extension."""
+    return os.path.splitext(os.path.basename(path))[0]
+
+
+def print_summary(summary):
+    """
+    Print the batch summary table and overall throughput.
+
+    Args:
+        summary (pandas.DataFrame): Result of run_batch
+    """
+    print(summary.drop(columns=['path', 'output_path']).to_string(index=False))
+    ok = summary[summary['status'] == 'ok']
+    print(f"\nStations: {len(summary)} ({len(ok)} ok, {len(summary) - len(ok)} failed)")
+    if len(ok):
+        print(f"Station-days: {int(ok['n_days'].sum())}, "
+              f"worker throughput: {ok['n_days'].sum() / ok['seconds'].sum():.0f} days/s")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Penman evaporation for many IMS station files')
+    parser.add_argument('inputs', nargs='+', help='Raw IMS CSV files or glob patterns')
+    parser.add_argument('--stations', required=True,
+                        help="Metadata CSV with 'station', 'latitude', 'elevation', 'albedo' columns")
+    parser.add_argument('--output-dir', default='results', help='Directory for result files')
+    parser.add_argument('--workers', type=int, default=None, help='Number of worker processes')
+    args = parser.parse_args()
+
+    input_paths = sorted({path for pattern in args.inputs for path in glob.glob(pattern)})
+    wall_start = time.perf_counter()
+    batch_summary = run_batch(input_paths, load_station_metadata(args.stations), args.output_dir,
+                              max_workers=args.workers)
+    print_summary(batch_summary)
+    print(f"Wall time: {time.perf_counter() - wall_start:.2f} s")
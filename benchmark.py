@@ -0,0 +1,192 @@
+"""
+----------------------------------------------------------------------
+Project: Penman Evaporation Calculator
+Filename: benchmark
+Author: Roy Elkayam
+Created: 2026-10-17
+Description: Benchmarks of data preparation and the evaporation evaluation paths
+----------------------------------------------------------------------
+"""
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import time
+import tracemalloc
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+from ims_data import data_preparation, parse_ims_datetime
+from penman_calculation import MultiStationPenmanEvaporation, PenmanEvaporation
+from pipeline import evaporation_from_raw
+from synthetic_data import generate_station_chunks
+
+# Benchmark sizes: name -> (stations, years)
+SIZES = {
+    '1x1': (1, 1),            # 1 station-year
+    '10x10': (10, 10),        # 10 station-decades
+    '100x10': (100, 10),      # 100 station-decades
+    '1000x10': (1000, 10),    # 1000 station-decades
+}
+
+STAGES = ['data_preparation', 'row_apply', 'batch', 'multi_station', 'fused_pipeline']
+
+
+def run_benchmark(n_stations, n_years, stages=None, seed=0):
+    """
+    Time every evaluation path for `n_stations` synthetic stations of `n_years` each.
+
+    Raw data is generated one station at a time, so memory stays bounded for large sizes.
+    Peak memory (tracemalloc) is measured on the first station only, in a separate untimed
+    run, so tracing does not distort the timings.
+
+    Args:
+        n_stations (int): Number of stations
+        n_years (int): Years of 10-minute data per station
+        stages (list, optional): Stages to run (default: all STAGES)
+        seed (int): Random seed
+
+    Returns:
+        list: One result dict per stage (seconds, station-days/s, peak memory)
+    """
+    stages = STAGES if stages is None else stages
+    n_days = n_years * 365
+    seconds = dict.fromkeys(stages, 0.0)
+    peak_bytes = {}
+    daily_frames = []
+
+    for station in range(n_stations):
+        latitude = 29.5 + station % 5
+        raw_df = pd.concat(generate_station_chunks(n_days=n_days, latitude_deg=latitude, seed=seed,
+                                                   station=station), ignore_index=True)
+        penman = PenmanEvaporation(latitude_deg=latitude, elevation=30, albedo=0.08)
+        measure_memory = station == 0
+
+        daily_df = _run_stage('data_preparation', seconds, peak_bytes, measure_memory,
+                              data_preparation, raw_df)
+        daily_frames.append(daily_df)
+        if 'row_apply' in stages:
+            _run_stage('row_apply', seconds, peak_bytes, measure_memory, _row_apply, penman, daily_df)
+        if 'batch' in stages:
+            _run_stage('batch', seconds, peak_bytes, measure_memory, _batch, penman, daily_df)
+        if 'fused_pipeline' in stages:
+            _run_stage('fused_pipeline', seconds, peak_bytes, measure_memory, _fused_pipeline, penman, raw_df)
+
+    if 'multi_station' in stages:
+        _run_stage('multi_station', seconds, peak_bytes, True, _multi_station, daily_frames)
+
+    station_days = n_stations * n_days
+    return [{
+        'stage': stage,
+        'stations': n_stations,
+        'years': n_years,
+        'station_days': station_days,
+        'seconds': seconds[stage],
+        'station_days_per_second': station_days / seconds[stage] if seconds[stage] > 0 else None,
+        'peak_memory_mb_first_station': peak_bytes.get(stage, 0) / 2 ** 20,
+    } for stage in stages]
+
+
+def _run_stage(stage, seconds, peak_bytes, measure_memory, func, *args):
+    """Time one call of `func`, accumulate it under `stage` and optionally record its peak memory."""
+    start = time.perf_counter()
+    result = func(*args)
+    seconds[stage] = seconds.get(stage, 0.0) + time.perf_counter() - start
+
+    if measure_memory:
+        tracemalloc.start()
+        func(*args)
+        peak_bytes[stage] = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    return result
+
+
+def _row_apply(penman, daily_df):
+    """Per-row path used by main.py before the batch API."""
+    def calculate_row_evaporation(row):
+        return penman.calculate_daily_evaporation(
+            datetime_obj=row.name,
+            t_mean=row['temperature'],
+            rh_mean=row['relative_humidity'],
+            rs=row['global_radiation'],
+            u=row['wind_speed']
+        )
+    return daily_df.apply(calculate_row_evaporation, axis=1)
+
+
+def _batch(penman, daily_df):
+    """Single-station vectorized path."""
+    return penman.calculate_daily_evaporation_batch(
+        dates=daily_df.index,
+        t_mean=daily_df['temperature'],
+        rh_mean=daily_df['relative_humidity'],
+        rs=daily_df['global_radiation'],
+        u=daily_df['wind_speed']
+    )
+
+
+def _fused_pipeline(penman, raw_df):
+    """Raw frame to evaporation with the fused pipeline, timestamp parsing included like data_preparation."""
+    timestamps = parse_ims_datetime(raw_df['datetime'])
+    columns = {name: raw_df[name].to_numpy() for name in raw_df.columns if name != 'datetime'}
+    return evaporation_from_raw(timestamps, columns, penman)
+
+
+def _multi_station(daily_frames):
+    """All stations as one stations × days matrix."""
+    latitudes = [29.5 + station % 5 for station in range(len(daily_frames))]
+    calculator = MultiStationPenmanEvaporation(latitudes, elevations=30, albedos=0.08)
+
+    def stack(column):
+        return np.stack([daily_df[column].to_numpy() for daily_df in daily_frames])
+
+    return calculator.calculate_daily_evaporation(
+        daily_frames[0].index, stack('temperature'), stack('relative_humidity'),
+        stack('global_radiation'), stack('wind_speed'))
+
+
+def environment_info():
+    """
+    Describe the machine and code version the benchmark ran on.
+
+    Returns:
+        dict: Timestamp, git commit, Python/NumPy/pandas versions and platform
+    """
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                                cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip() or None
+    except OSError:
+        commit = None
+    return {
+        'timestamp': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'git_commit': commit,
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'pandas': pd.__version__,
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Benchmark the Penman evaporation pipeline')
+    parser.add_argument('--sizes', nargs='+', default=['1x1', '10x10'], choices=list(SIZES),
+                        help='Benchmark sizes (stations x years)')
+    parser.add_argument('--stages', nargs='+', default=STAGES, choices=STAGES, help='Stages to run')
+    parser.add_argument('--output', default='benchmark_results.jsonl',
+                        help='JSON Lines file the run is appended to')
+    args = parser.parse_args()
+
+    run = {'environment': environment_info(), 'results': []}
+    for size in args.sizes:
+        results = run_benchmark(*SIZES[size], stages=args.stages)
+        run['results'].extend(results)
+        print(f"\n{size} ({SIZES[size][0]} stations x {SIZES[size][1]} years)")
+        print(pd.DataFrame(results).drop(columns=['stations', 'years']).to_string(index=False))
+
+    with open(args.output, 'a') as f:
+        f.write(json.dumps(run) + '\n')
+    print(f"\nResults appended to {args.output}")
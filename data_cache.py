@@ -0,0 +1,158 @@
+"""
+----------------------------------------------------------------------
+Project: Penman Evaporation Calculator
+Filename: data_cache
+Author: Roy Elkayam
+Created: 2026-10-17
+Description: On-disk cache of prepared daily data keyed by source file fingerprint
+----------------------------------------------------------------------
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+
+import pandas as pd
+from ims_data import DAILY_AGGREGATIONS, W_M2_TO_MJ_M2_DAY, UnsortedDataError, data_preparation, iter_daily_chunks
+
+# Bump when the layout of cached data changes, so stale entries are never read
+CACHE_VERSION = 1
+
+CACHE_DIR_ENV = 'PENMAN_CACHE_DIR'
+CACHE_ENV = 'PENMAN_CACHE'  # '0' disables the cache in main.py
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser('~'), '.cache', 'penman_evaporation')
+DEFAULT_MAX_BYTES = 2 * 2 ** 30
+
+# Bytes hashed at each end of the source file for its fingerprint
+FINGERPRINT_SAMPLE_BYTES = 2 ** 20
+
+
+def cache_enabled():
+    """True unless the cache is switched off with PENMAN_CACHE=0."""
+    return os.environ.get(CACHE_ENV, '1').strip().lower() not in ('0', 'false', 'no', 'off')
+
+
+def file_fingerprint(path, full_hash=False):
+    """
+    Fingerprint a source file from its size, modification time and content hash.
+
+    By default only the first and last FINGERPRINT_SAMPLE_BYTES are hashed, which keeps the
+    cost constant for multi-GB files while still catching rewrites that keep size and mtime.
+
+    Args:
+        path (str): Source file path
+        full_hash (bool): Hash the whole file instead of its two ends
+
+    Returns:
+        dict: size, mtime_ns and content hash of the file
+    """
+    stat = os.stat(path)
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, 'rb') as f:
+        if full_hash or stat.st_size <= 2 * FINGERPRINT_SAMPLE_BYTES:
+            for block in iter(lambda: f.read(2 ** 24), b''):
+                digest.update(block)
+        else:
+            digest.update(f.read(FINGERPRINT_SAMPLE_BYTES))
+            f.seek(-FINGERPRINT_SAMPLE_BYTES, os.SEEK_END)
+            digest.update(f.read(FINGERPRINT_SAMPLE_BYTES))
+    return {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns, 'hash': digest.hexdigest()}
+
+
+def prepare_daily_cached(path, cache_dir=None, max_bytes=DEFAULT_MAX_BYTES, chunksize=500_000,
+                         full_hash=False):
+    """
+    Return the daily DataFrame of a raw IMS CSV, reusing a cached copy when the source is unchanged.
+
+    The cache key combines the file fingerprint with the aggregation settings, so a changed
+    source or changed settings miss the cache automatically; entries of older versions of the
+    same source are deleted when the new one is written. Entries are pickled DataFrames, and
+    the least recently used ones are evicted once the cache exceeds `max_bytes`.
+
+    Args:
+        path (str): Raw IMS CSV path
+        cache_dir (str, optional): Cache directory (default: PENMAN_CACHE_DIR or ~/.cache/penman_evaporation)
+        max_bytes (int): Maximum total size of the cache directory
+        chunksize (int): Rows per chunk when the CSV has to be parsed
+        full_hash (bool): Hash the whole source file for the fingerprint
+
+    Returns:
+        pandas.DataFrame: Daily data in the data_preparation layout
+    """
+    cache_dir = cache_dir or os.environ.get(CACHE_DIR_ENV, DEFAULT_CACHE_DIR)
+    os.makedirs(cache_dir, exist_ok=True)
+
+    source_id = hashlib.blake2b(os.path.abspath(path).encode(), digest_size=8).hexdigest()
+    key_data = {
+        'version': CACHE_VERSION,
+        'fingerprint': file_fingerprint(path, full_hash=full_hash),
+        'aggregations': DAILY_AGGREGATIONS,
+        'radiation_factor': W_M2_TO_MJ_M2_DAY,
+    }
+    key = hashlib.blake2b(json.dumps(key_data, sort_keys=True).encode(), digest_size=16).hexdigest()
+    entry_path = os.path.join(cache_dir, f'{source_id}_{key}.pkl')
+
+    if os.path.exists(entry_path):
+        try:
+            daily_df = pd.read_pickle(entry_path)
+            os.utime(entry_path)  # mark as recently used
+            return daily_df
+        except Exception:  # unreadable entry (e.g. interrupted write): rebuild it
+            os.remove(entry_path)
+
+    try:
+        chunks = list(iter_daily_chunks(path, chunksize=chunksize))
+    except UnsortedDataError:
+        chunks = []  # rows out of chronological order: data_preparation sorts the whole file
+    daily_df = pd.concat(chunks).asfreq('D') if chunks else data_preparation(pd.read_csv(path))
+
+    # Drop entries of older versions of this source, then write atomically
+    for name in os.listdir(cache_dir):
+        if name.startswith(f'{source_id}_') and name.endswith('.pkl'):
+            os.remove(os.path.join(cache_dir, name))
+    fd, tmp_path = tempfile.mkstemp(dir=cache_dir, suffix='.tmp')
+    os.close(fd)
+    daily_df.to_pickle(tmp_path)
+    os.replace(tmp_path, entry_path)
+
+    evict_cache(cache_dir, max_bytes)
+    return daily_df
+
+
+def evict_cache(cache_dir, max_bytes):
+    """
+    Delete least recently used cache entries until the cache fits in `max_bytes`.
+
+    Args:
+        cache_dir (str): Cache directory
+        max_bytes (int): Maximum total size of the cache entries
+
+    Returns:
+        int: Number of entries deleted
+    """
+    entries = []
+    for name in os.listdir(cache_dir):
+        if name.endswith('.pkl'):
+            stat = os.stat(os.path.join(cache_dir, name))
+            entries.append((stat.st_mtime, stat.st_size, name))
+
+    total = sum(size for _, size, _ in entries)
+    removed = 0
+    for _, size, name in sorted(entries):
+        if total <= max_bytes:
+            break
+        os.remove(os.path.join(cache_dir, name))
+        total -= size
+        removed += 1
+    return removed
+
+
+def clear_cache(cache_dir=None):
+    """
+    Delete every cache entry.
+
+    Args:
+        cache_dir (str, optional): Cache directory (default: PENMAN_CACHE_DIR or ~/.cache/penman_evaporation)
+    """
+    evict_cache(cache_dir or os.environ.get(CACHE_DIR_ENV, DEFAULT_CACHE_DIR), 0)
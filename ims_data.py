@@ -0,0 +1,431 @@
+"""
+----------------------------------------------------------------------
+Project: Penman Evaporation Calculator
+Filename: ims_data
+Author: Roy Elkayam
+Created: 2026-10-17
+Description: Loading and daily aggregation of 10-minute IMS weather data
+----------------------------------------------------------------------
+"""
+
+import numpy as np
+import pandas as pd
+
+IMS_DATETIME_FORMAT = '%d/%m/%Y %H:%M'
+W_M2_TO_MJ_M2_DAY = 0.0864  # mean W/m² over a day -> MJ/m²/day
+
+# Fixed-width layout of IMS timestamps: 'dd/mm/YYYY HH:MM'
+_IMS_DATETIME_WIDTH = 16
+_IMS_DIGIT_OFFSETS = [0, 1, 3, 4, 6, 7, 8, 9, 11, 12, 14, 15]
+_IMS_SEPARATORS = {2: b'/', 5: b'/', 10: b' ', 13: b':'}
+NS_PER_DAY = 86_400 * 10 ** 9
+NAT_NS = np.iinfo(np.int64).min  # NaT as epoch nanoseconds
+_DAYS_IN_MONTH = np.array([31, 28, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31])
+
+# Define aggregation functions for each column
+DAILY_AGGREGATIONS = {
+    'temperature': 'mean',  # average
+    'global_radiation': 'mean',  # average
+    'precipitation': 'sum',  # sum
+    'relative_humidity': 'mean',  # average
+    'wind_speed': 'mean'  # average
+}
+
+
+class UnsortedDataError(ValueError):
+    """Raised by the chunked readers when rows arrive after their day was already emitted."""
+
+
+def data_preparation(df):
+    df = df.copy()
+    df['datetime'] = parse_ims_datetime(df['datetime'])
+    df = df.set_index('datetime')
+    return _aggregate_daily(df)
+
+
+def parse_ims_datetime(values):
+    """
+    Parse IMS timestamps ('%d/%m/%Y %H:%M') into datetime64 values.
+
+    Well-formed values are decoded directly from their fixed character offsets into int64
+    epoch nanoseconds. Rows that do not match the fixed-width layout (e.g. '1/2/2020 3:05')
+    are passed to pd.to_datetime with the same format, which raises on unparseable values.
+
+    Already typed datetime64 values (e.g. read from Parquet) are returned without parsing.
+
+    Args:
+        values (array-like): Timestamp strings
+
+    Returns:
+        numpy.ndarray: datetime64[ns] timestamps
+    """
+    if pd.api.types.is_datetime64_any_dtype(getattr(values, 'dtype', None)):
+        return np.asarray(values, dtype='datetime64[ns]')
+
+    epoch_ns, valid = _decode_ims_datetime(values)
+    if not valid.all():
+        values = np.asarray(values, dtype=object)
+        fallback = pd.to_datetime(values[~valid], format=IMS_DATETIME_FORMAT)
+        epoch_ns[~valid] = np.asarray(fallback, dtype='datetime64[ns]').view(np.int64)
+    return epoch_ns.view('datetime64[ns]')
+
+
+def format_ims_datetime(timestamps):
+    """
+    Format timestamps as IMS '%d/%m/%Y %H:%M' strings.
+
+    Inverse of parse_ims_datetime: digits are written straight into a fixed-width byte
+    buffer, which is much faster than strftime on long series.
+
+    Args:
+        timestamps (array-like): datetime64 timestamps
+
+    Returns:
+        numpy.ndarray: Unicode timestamp strings
+    """
+    epoch_minutes = np.asarray(timestamps, dtype='datetime64[m]').view(np.int64)
+    days, minute_of_day = np.divmod(epoch_minutes, 24 * 60)
+    hour, minute = np.divmod(minute_of_day, 60)
+
+    # Civil date from days since 1970-01-01 (Hinnant's civil_from_days)
+    z = days + 719468
+    era = z // 146097
+    doe = z - era * 146097
+    yoe = (doe - doe // 1460 + doe // 36524 - doe // 146096) // 365
+    doy = doe - (365 * yoe + yoe // 4 - yoe // 100)
+    mp = (5 * doy + 2) // 153
+    day = doy - (153 * mp + 2) // 5 + 1
+    month = np.where(mp < 10, mp + 3, mp - 9)
+    year = yoe + era * 400 + (month <= 2)
+
+    chars = np.empty((len(epoch_minutes), _IMS_DATETIME_WIDTH), dtype=np.uint8)
+    fields = [day // 10, day % 10, month // 10, month % 10, year // 1000, year // 100 % 10,
+              year // 10 % 10, year % 10, hour // 10, hour % 10, minute // 10, minute % 10]
+    for offset, digit in zip(_IMS_DIGIT_OFFSETS, fields):
+        chars[:, offset] = digit + ord('0')
+    for offset, separator in _IMS_SEPARATORS.items():
+        chars[:, offset] = ord(separator)
+    return chars.view(f'S{_IMS_DATETIME_WIDTH}').ravel().astype(f'U{_IMS_DATETIME_WIDTH}')
+
+
+def find_malformed_ims_datetime(values):
+    """
+    Report timestamps that cannot be parsed as '%d/%m/%Y %H:%M'.
+
+    Only the fixed-width byte checks run over the full column; the generic parser is
+    consulted for the few rows that fail them. These are the rows parse_ims_datetime
+    rejects; missing values (None, NaN, '') are not reported, since they parse to NaT.
+
+    Args:
+        values (array-like): Timestamp strings
+
+    Returns:
+        numpy.ndarray: Positions of the malformed rows
+    """
+    _, valid = _decode_ims_datetime(values, decode=False)
+    suspect = np.flatnonzero(~valid)
+    if suspect.size:
+        candidates = np.asarray(values, dtype=object)[suspect]
+        parsed = pd.to_datetime(candidates, format=IMS_DATETIME_FORMAT, errors='coerce')
+        missing = pd.isna(candidates) | (candidates == '')
+        suspect = suspect[np.asarray(parsed.isna()) & ~missing]
+    return suspect
+
+
+def _decode_ims_datetime(values, decode=True):
+    """
+    Decode fixed-width 'dd/mm/YYYY HH:MM' timestamps by character offset.
+
+    Args:
+        values (array-like): Timestamp strings
+        decode (bool): Compute epoch values; False only validates the layout
+
+    Returns:
+        tuple: (int64 epoch nanoseconds or None, boolean mask of rows in the fixed-width layout)
+    """
+    values = np.asarray(values, dtype=object)
+    try:
+        # One extra byte so that over-long strings are detected
+        raw = values.astype(f'S{_IMS_DATETIME_WIDTH + 1}')
+    except (UnicodeEncodeError, ValueError, TypeError):
+        return np.zeros(len(values), dtype=np.int64), np.zeros(len(values), dtype=bool)
+    chars = raw.view(np.uint8).reshape(-1, _IMS_DATETIME_WIDTH + 1)
+
+    digits = chars[:, _IMS_DIGIT_OFFSETS].astype(np.int64) - ord('0')
+    valid = (chars[:, _IMS_DATETIME_WIDTH] == 0) & ((digits >= 0) & (digits <= 9)).all(axis=1)
+    for offset, separator in _IMS_SEPARATORS.items():
+        valid &= chars[:, offset] == ord(separator)
+
+    day = digits[:, 0] * 10 + digits[:, 1]
+    month = digits[:, 2] * 10 + digits[:, 3]
+    year = digits[:, 4] * 1000 + digits[:, 5] * 100 + digits[:, 6] * 10 + digits[:, 7]
+    hour = digits[:, 8] * 10 + digits[:, 9]
+    minute = digits[:, 10] * 10 + digits[:, 11]
+
+    month_ok = (month >= 1) & (month <= 12)
+    leap = (year % 4 == 0) & ((year % 100 != 0) | (year % 400 == 0))
+    days_in_month = _DAYS_IN_MONTH[np.where(month_ok, month, 1) - 1] + (leap & (month == 2))
+    valid &= month_ok & (day >= 1) & (day <= days_in_month) & (hour < 24) & (minute < 60)
+    if not decode:
+        return None, valid
+
+    # Days since 1970-01-01 from the civil date (Hinnant's days_from_civil)
+    y = year - (month <= 2)
+    era = y // 400
+    yoe = y - era * 400
+    doy = (153 * (month + np.where(month > 2, -3, 9)) + 2) // 5 + day - 1
+    doe = yoe * 365 + yoe // 4 - yoe // 100 + doy
+    days = era * 146097 + doe - 719468
+
+    epoch_ns = ((days * 24 + hour) * 60 + minute) * 60_000_000_000
+    return np.where(valid, epoch_ns, 0), valid
+
+
+def iter_daily_chunks(path, chunksize=500_000):
+    """
+    Stream a raw 10-minute IMS CSV and yield finished daily aggregates chunk by chunk.
+
+    The file is read `chunksize` rows at a time (see iter_raw_day_blocks), so every day
+    is aggregated exactly once and peak memory is bounded by the chunk size rather than
+    the archive length. The rows must be in chronological order, as in IMS exports;
+    otherwise UnsortedDataError is raised (see iter_raw_day_blocks).
+
+    Args:
+        path (str): Path of the raw CSV file
+        chunksize (int): Number of raw rows read per chunk
+
+    Yields:
+        pandas.DataFrame: Daily aggregates in the same layout as data_preparation
+    """
+    next_day = None
+    for timestamps, columns in iter_raw_day_blocks(path, chunksize):
+        days, daily, sample_count = aggregate_daily_arrays(timestamps, columns, start=next_day)
+        next_day = days[-1] + np.timedelta64(1, 'D')
+        yield _daily_frame(days, daily, sample_count)
+
+
+def iter_raw_day_blocks(path, chunksize=500_000, columns=None):
+    """
+    Read a raw 10-minute IMS CSV in chunks and yield blocks made of whole days only.
+
+    Rows of the last (possibly incomplete) day of each chunk are carried over to the next
+    chunk, so no day is ever split across two blocks. Only the requested columns are parsed.
+
+    Rows may be out of order within a chunk, but a row of a day that was already yielded
+    raises UnsortedDataError; callers then fall back to loading the whole file.
+
+    Args:
+        path (str): Path of the raw CSV file
+        chunksize (int): Number of raw rows read per chunk
+        columns (list, optional): Observation columns to load (default: DAILY_AGGREGATIONS columns)
+
+    Yields:
+        tuple: (datetime64[ns] timestamps, dict of column name -> float array)
+    """
+    if columns is None:
+        columns = list(DAILY_AGGREGATIONS)
+
+    carry_timestamps, carry_values = None, None
+    yielded_until = None  # start of the first day not yet yielded
+    for chunk in pd.read_csv(path, chunksize=chunksize, usecols=['datetime', *columns]):
+        timestamps = parse_ims_datetime(chunk['datetime'])
+        values = {name: chunk[name].to_numpy(dtype=float) for name in columns}
+        has_time = ~np.isnat(timestamps)
+        if not has_time.all():  # rows without a timestamp are skipped, as by resample
+            timestamps = timestamps[has_time]
+            values = {name: values[name][has_time] for name in columns}
+        if yielded_until is not None and timestamps.size and timestamps.min() < yielded_until:
+            raise UnsortedDataError(f"{path} is not in chronological order")
+        if carry_timestamps is not None:
+            timestamps = np.concatenate([carry_timestamps, timestamps])
+            values = {name: np.concatenate([carry_values[name], values[name]]) for name in columns}
+        if not timestamps.size:
+            continue
+
+        # The last day in the chunk may continue in the next one
+        yielded_until = timestamps.max().astype('datetime64[D]')
+        is_complete = timestamps < yielded_until
+        carry_timestamps = timestamps[~is_complete]
+        carry_values = {name: values[name][~is_complete] for name in columns}
+        if is_complete.any():
+            yield timestamps[is_complete], {name: values[name][is_complete] for name in columns}
+
+    if carry_timestamps is not None and carry_timestamps.size:
+        yield carry_timestamps, carry_values
+
+
+def aggregate_daily_arrays(timestamps, columns, aggregations=None, start=None):
+    """
+    Aggregate raw observations into daily values in a single grouped pass.
+
+    Day indices and day boundaries are computed once from the timestamps; every column is
+    then reduced with np.add.reduceat over those boundaries, so all means, sums and per-day
+    sample counts come out of one pass without building a resampler. Like
+    DataFrame.resample, NaN values are skipped and days without data are included
+    (NaN mean, zero sum). Unsorted input is sorted once up front.
+
+    Args:
+        timestamps (array-like): Observation timestamps (datetime64 values)
+        columns (dict): Column name -> array of observations
+        aggregations (dict, optional): Column name -> 'mean' or 'sum' (default DAILY_AGGREGATIONS)
+        start (pandas.Timestamp, optional): First day of the output, if earlier than the data
+
+    Returns:
+        tuple: (datetime64[ns] day starts, dict of daily arrays, per-day sample counts)
+    """
+    if aggregations is None:
+        aggregations = DAILY_AGGREGATIONS
+    days, sums, counts, sample_count = daily_sums_and_counts(timestamps, columns, list(aggregations), start)
+    return days, finalize_daily(sums, counts, aggregations), sample_count
+
+
+def daily_sums_and_counts(timestamps, columns, names=None, start=None):
+    """
+    Reduce raw observations to per-day sums and counts of valid (non-NaN) values.
+
+    This is the additive part of the daily aggregation: sums and counts of two pieces of
+    the same day can simply be added, which lets partial days be carried between runs.
+
+    Args:
+        timestamps (array-like): Observation timestamps (datetime64 values)
+        columns (dict): Column name -> array of observations
+        names (list, optional): Columns to reduce (default: DAILY_AGGREGATIONS columns)
+        start (pandas.Timestamp, optional): First day of the output, if earlier than the data
+
+    Returns:
+        tuple: (datetime64[ns] day starts, dict of daily sums, dict of daily valid counts,
+            per-day sample counts)
+    """
+    if names is None:
+        names = list(DAILY_AGGREGATIONS)
+
+    timestamps = np.asarray(timestamps, dtype='datetime64[ns]')
+    has_time = ~np.isnat(timestamps)
+    if not has_time.all():  # rows without a timestamp are skipped, as by resample
+        timestamps = timestamps[has_time]
+        columns = {name: np.asarray(columns[name])[has_time] for name in names}
+
+    day = timestamps.view(np.int64) // NS_PER_DAY
+    order = None
+    if np.any(day[1:] < day[:-1]):
+        order = np.argsort(day, kind='stable')
+        day = day[order]
+
+    if not day.size:
+        empty = np.array([], dtype=np.int64)
+        return (np.array([], dtype='datetime64[ns]'), {name: np.array([]) for name in names},
+                {name: empty for name in names}, empty)
+
+    first_day = day[0]
+    if start is not None:
+        first_day = min(first_day, pd.Timestamp(start).value // NS_PER_DAY)
+    n_days = int(day[-1] - first_day) + 1
+
+    # Boundaries of the runs of equal days and the output slot of each run
+    starts = np.flatnonzero(np.concatenate(([True], day[1:] != day[:-1])))
+    slots = day[starts] - first_day
+    run_length = np.diff(np.append(starts, day.size))
+
+    sample_count = np.zeros(n_days, dtype=np.int64)
+    sample_count[slots] = run_length
+    sums, counts = {}, {}
+    for name in names:
+        values = np.asarray(columns[name], dtype=float)
+        if order is not None:
+            values = values[order]
+        missing = np.isnan(values)
+        sums[name] = np.zeros(n_days)
+        if missing.any():
+            sums[name][slots] = np.add.reduceat(np.where(missing, 0, values), starts)
+            counts[name] = np.zeros(n_days, dtype=np.int64)
+            counts[name][slots] = run_length - np.add.reduceat(missing, starts, dtype=np.int64)
+        else:
+            sums[name][slots] = np.add.reduceat(values, starts)
+            counts[name] = sample_count
+
+    days = ((first_day + np.arange(n_days)) * NS_PER_DAY).view('datetime64[ns]')
+    return days, sums, counts, sample_count
+
+
+def finalize_daily(sums, counts, aggregations=None):
+    """
+    Turn per-day sums and valid counts into daily means/sums.
+
+    Args:
+        sums (dict): Column name -> daily sums
+        counts (dict): Column name -> daily valid counts
+        aggregations (dict, optional): Column name -> 'mean' or 'sum' (default DAILY_AGGREGATIONS)
+
+    Returns:
+        dict: Column name -> daily aggregated values (NaN mean and zero sum for days without data)
+    """
+    if aggregations is None:
+        aggregations = DAILY_AGGREGATIONS
+
+    daily = {}
+    for name, how in aggregations.items():
+        if how == 'sum':
+            daily[name] = sums[name]
+        elif how == 'mean':
+            with np.errstate(invalid='ignore', divide='ignore'):
+                daily[name] = sums[name] / counts[name]
+        else:
+            raise ValueError(f"Invalid aggregation '{how}' for column '{name}'")
+    return daily
+
+
+def convert_daily_units(daily):
+    """
+    Convert daily aggregates to the units of the daily results (radiation from W/m² to MJ/m²/day).
+
+    Args:
+        daily (dict): Column name -> daily aggregated values, as returned by finalize_daily
+
+    Returns:
+        dict: Column name -> daily values in result units (a new dict)
+    """
+    daily = dict(daily)
+    if 'global_radiation' in daily:
+        daily['global_radiation'] = daily['global_radiation'] * W_M2_TO_MJ_M2_DAY  # Convert W/m² to MJ/m²/day
+    return daily
+
+
+def _aggregate_daily(df, start=None):
+    """
+    Aggregate datetime-indexed 10-minute observations into daily values.
+
+    Args:
+        df (pandas.DataFrame): Raw observations indexed by timestamp
+        start (pandas.Timestamp, optional): First day of the output; days between it and
+            the first observation are emitted as empty days, as resample would
+
+    Returns:
+        pandas.DataFrame: Daily aggregates with radiation in MJ/m²/day and per-day sample counts
+    """
+    days, daily, sample_count = aggregate_daily_arrays(
+        df.index, {name: df[name].to_numpy() for name in DAILY_AGGREGATIONS}, start=start)
+    return _daily_frame(days, daily, sample_count, index_name=df.index.name)
+
+
+def _daily_frame(days, daily, sample_count, index_name='datetime'):
+    """
+    Build the daily DataFrame returned by data_preparation from aggregated arrays.
+
+    Args:
+        days (numpy.ndarray): datetime64 day starts
+        daily (dict): Column name -> daily aggregated values
+        sample_count (numpy.ndarray): Number of raw samples per day
+        index_name (str): Name of the DatetimeIndex
+
+    Returns:
+        pandas.DataFrame: Daily aggregates with radiation in MJ/m²/day and per-day sample counts
+    """
+    daily_df = pd.DataFrame(convert_daily_units(daily), index=pd.DatetimeIndex(days, freq='D', name=index_name))
+    # Optional: Round the averages to a reasonable number of decimal places
+    # daily_df['temperature'] = daily_df['temperature'].round(2)
+    # daily_df['relative_humidity'] = daily_df['relative_humidity'].round(1)
+    # daily_df['wind_speed'] = daily_df['wind_speed'].round(2)
+
+    daily_df['sample_count'] = sample_count
+    daily_df['datetime'] = daily_df.index
+    return daily_df
@@ -0,0 +1,200 @@
+"""
+----------------------------------------------------------------------
+Project: Penman Evaporation Calculator
+Filename: incremental
+Author: Roy Elkayam
+Created: 2026-10-17
+Description: Incremental (append-only) daily evaporation for growing 10-minute feeds
+----------------------------------------------------------------------
+"""
+
+import argparse
+import io
+import json
+import os
+
+import numpy as np
+import pandas as pd
+from ims_data import (DAILY_AGGREGATIONS, NS_PER_DAY, convert_daily_units, daily_sums_and_counts, finalize_daily,
+                      parse_ims_datetime)
+from penman_calculation import PenmanEvaporation
+from pipeline import RESULT_COLUMNS, evaporate_daily
+
+
+def update_incremental(source_path, results_path, penman, state_path=None, wind_function='penman1948',
+                       close_last_day=False):
+    """
+    Process only the rows appended to a raw IMS CSV since the previous run.
+
+    The state file keeps the byte offset reached in the source, the last processed timestamp
+    and the running sums/counts of the day that was still open. Each run reads from that
+    offset, adds the new rows to the open day, finalizes every day that is now complete,
+    appends their evaporation to the results CSV and stores the new open day. The cost of a
+    run therefore depends on the new data only. Rows not later than the last processed
+    timestamp are ignored, and a partially written last line is left for the next run.
+
+    The state also records the size of the results CSV it is consistent with. A run that
+    stopped after appending results but before saving its state leaves extra rows behind;
+    the next run truncates them and processes the same source rows again, so no day is
+    written twice.
+
+    Args:
+        source_path (str): Raw IMS CSV that grows over time
+        results_path (str): Daily results CSV that is appended to
+        penman (PenmanEvaporation): Calculator for the station
+        state_path (str, optional): State file (default: results_path + '.state.json')
+        wind_function (str): Wind function to use ('penman1948', 'penman1956', 'linacre1993')
+        close_last_day (bool): Also finalize the last (possibly incomplete) day, e.g. at the end of an archive
+
+    Returns:
+        pandas.DataFrame: The newly appended daily results
+    """
+    state_path = state_path or results_path + '.state.json'
+    if not os.path.exists(state_path):
+        # Record the results size before the first append, so an interrupted first run is undone too
+        _save_state(state_path, _load_state(state_path, source_path, results_path))
+    state = _load_state(state_path, source_path, results_path)
+    _truncate_results(results_path, state['results_size'])
+
+    header, offset, raw_df = _read_new_rows(source_path, state['offset'], state['header'])
+    state['header'], state['offset'] = header, offset
+
+    timestamps = parse_ims_datetime(raw_df['datetime']).view(np.int64)
+    is_new = timestamps > state['last_timestamp'] if state['last_timestamp'] is not None else \
+        np.ones(len(timestamps), dtype=bool)
+    timestamps = timestamps[is_new]
+    columns = {name: raw_df[name].to_numpy(dtype=float)[is_new] for name in DAILY_AGGREGATIONS}
+
+    if not timestamps.size and not (close_last_day and state['open_day'] is not None):
+        _save_state(state_path, state)
+        return _empty_results()
+
+    # Per-day sums of the new rows, starting at the open day (or the first day not yet emitted)
+    start_day = state['open_day'] if state['open_day'] is not None else state['next_day']
+    start = None if start_day is None else pd.Timestamp(start_day * NS_PER_DAY)
+    if timestamps.size:
+        days, sums, counts, sample_count = daily_sums_and_counts(timestamps.view('datetime64[ns]'), columns,
+                                                                 start=start)
+        counts = {name: values.copy() for name, values in counts.items()}  # may alias sample_count
+        sample_count = sample_count.copy()
+    else:
+        days = np.array([start], dtype='datetime64[ns]')
+        sums = {name: np.zeros(1) for name in DAILY_AGGREGATIONS}
+        counts = {name: np.zeros(1, dtype=np.int64) for name in DAILY_AGGREGATIONS}
+        sample_count = np.zeros(1, dtype=np.int64)
+
+    if state['open_day'] is not None:
+        # Slot 0 is the day left open by the previous run
+        for name in DAILY_AGGREGATIONS:
+            sums[name][0] += state['open_sums'][name]
+            counts[name][0] += state['open_counts'][name]
+        sample_count[0] += state['open_samples']
+
+    n_complete = len(days) if close_last_day else len(days) - 1
+    results = _finalize_days(days[:n_complete], {name: values[:n_complete] for name, values in sums.items()},
+                             {name: values[:n_complete] for name, values in counts.items()},
+                             sample_count[:n_complete], penman, wind_function)
+    if len(results):
+        results.to_csv(results_path, mode='a', header=not os.path.exists(results_path))
+        state['results_size'] = os.path.getsize(results_path)
+
+    if timestamps.size:
+        state['last_timestamp'] = int(timestamps.max())
+    last_day = int(days[-1].astype(np.int64) // NS_PER_DAY)
+    if close_last_day:
+        state.update(open_day=None, open_sums=None, open_counts=None, open_samples=0, next_day=last_day + 1)
+    else:
+        state.update(open_day=last_day, next_day=last_day,
+                     open_sums={name: float(sums[name][-1]) for name in DAILY_AGGREGATIONS},
+                     open_counts={name: int(counts[name][-1]) for name in DAILY_AGGREGATIONS},
+                     open_samples=int(sample_count[-1]))
+    _save_state(state_path, state)
+    return results
+
+
+def _finalize_days(days, sums, counts, sample_count, penman, wind_function):
+    """Turn completed days' sums/counts into daily values and evaporation (RESULT_COLUMNS layout)."""
+    daily = convert_daily_units(finalize_daily(sums, counts))
+    daily['sample_count'] = sample_count
+    daily['penman_evaporation'] = evaporate_daily(days, daily, penman, wind_function=wind_function)
+    index = pd.DatetimeIndex(days, name='datetime')
+    return pd.DataFrame({name: daily[name] for name in RESULT_COLUMNS}, index=index)
+
+
+def _empty_results():
+    """Empty results frame in the RESULT_COLUMNS layout."""
+    return pd.DataFrame(columns=list(RESULT_COLUMNS), index=pd.DatetimeIndex([], name='datetime'))
+
+
+def _read_new_rows(source_path, offset, header):
+    """
+    Read the complete lines appended to the source since `offset`.
+
+    Returns:
+        tuple: (CSV header columns or None if not complete yet, new byte offset, DataFrame of the new rows)
+    """
+    with open(source_path, 'rb') as f:
+        if header is None:
+            header_line = f.readline()
+            if header_line.endswith(b'\n'):
+                header = header_line.decode().strip().split(',')
+                offset = len(header_line)
+        f.seek(offset)
+        data = f.read() if header is not None else b''  # Wait until the header line is complete
+
+    # Leave a partially written last line for the next run
+    data = data[:data.rfind(b'\n') + 1]
+    usecols = ['datetime', *DAILY_AGGREGATIONS]
+    if data.strip():
+        raw_df = pd.read_csv(io.BytesIO(data), header=None, names=header, usecols=usecols)
+    else:
+        raw_df = pd.DataFrame({name: pd.Series(dtype=object if name == 'datetime' else float) for name in usecols})
+    return header, offset + len(data), raw_df
+
+
+def _load_state(state_path, source_path, results_path):
+    """Load the incremental state, or a fresh one (keeping any existing results) if there is none yet."""
+    if not os.path.exists(state_path):
+        return {'source': os.path.abspath(source_path), 'offset': 0, 'header': None, 'last_timestamp': None,
+                'open_day': None, 'open_sums': None, 'open_counts': None, 'open_samples': 0, 'next_day': None,
+                'results_size': os.path.getsize(results_path) if os.path.exists(results_path) else 0}
+
+    with open(state_path) as f:
+        state = json.load(f)
+    if state['source'] != os.path.abspath(source_path):
+        raise ValueError(f"State {state_path} belongs to {state['source']}, not {source_path}")
+    if state['offset'] > os.path.getsize(source_path):
+        raise ValueError(f"{source_path} is shorter than at the previous run; "
+                         f"delete {state_path} and the results to reprocess it")
+    state.setdefault('results_size', None)  # State written before the results size was recorded
+    return state
+
+
+def _truncate_results(results_path, results_size):
+    """Drop results appended after the state was last saved (an interrupted run)."""
+    if results_size is not None and os.path.exists(results_path) and os.path.getsize(results_path) > results_size:
+        os.truncate(results_path, results_size)
+        if results_size == 0:
+            os.remove(results_path)  # The header is written again with the first rows
+
+
+def _save_state(state_path, state):
+    """Write the state atomically."""
+    tmp_path = state_path + '.tmp'
+    with open(tmp_path, 'w') as f:
+        json.dump(state, f, indent=2)
+    os.replace(tmp_path, state_path)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Append evaporation for newly arrived days')
+    parser.add_argument('source', help='Raw IMS CSV that grows over time')
+    parser.add_argument('results', help='Daily results CSV to append to')
+    parser.add_argument('--latitude', type=float, required=True, help='Station latitude (decimal degrees)')
+    parser.add_argument('--elevation', type=float, default=0, help='Station elevation (m)')
+    parser.add_argument('--albedo', type=float, default=0.08, help='Surface albedo')
+    args = parser.parse_args()
+
+    new_days = update_incremental(args.source, args.results,
+                                  PenmanEvaporation(args.latitude, args.elevation, args.albedo))
+    print(f"Appended {len(new_days)} days to {args.results}")
@@ -0,0 +1,203 @@
+"""
+----------------------------------------------------------------------
+Project: Penman Evaporation Calculator
+Filename: instrumentation
+Author: Roy Elkayam
+Created: 2026-10-17
+Description: Stage-level timing and memory instrumentation for the evaporation pipeline
+----------------------------------------------------------------------
+"""
+
+import json
+import os
+import sys
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+try:
+    import resource
+except ImportError:  # Not available on Windows; peak RSS is then not reported
+    resource = None
+
+# Environment switches
+PROFILE_ENV = 'PENMAN_PROFILE'                          # '1' enables stage timing
+PROFILE_ALLOCATIONS_ENV = 'PENMAN_PROFILE_ALLOCATIONS'  # '1' also traces Python/NumPy allocations
+PROFILE_JSON_ENV = 'PENMAN_PROFILE_JSON'                # path of the JSON report written by report()
+
+
+class StageRecord:
+    """
+    Measurements of one pipeline stage. `rows` can be set inside the stage block.
+    """
+
+    def __init__(self, name, rows=None):
+        self.name = name
+        self.rows = rows
+        self.wall_seconds = None
+        self.cpu_seconds = None
+        self.peak_rss_mb = None
+        self.peak_allocated_mb = None
+
+    def to_dict(self):
+        """Return the stage measurements as a dict."""
+        return {
+            'stage': self.name,
+            'rows': self.rows,
+            'wall_seconds': self.wall_seconds,
+            'cpu_seconds': self.cpu_seconds,
+            'rows_per_second': self.rows / self.wall_seconds if self.rows and self.wall_seconds else None,
+            'peak_rss_mb': self.peak_rss_mb,
+            'peak_allocated_mb': self.peak_allocated_mb,
+        }
+
+
+class PipelineProfiler:
+    """
+    Records wall time, CPU time, row counts and peak memory for named pipeline stages.
+
+    Disabled profilers still hand out stage records, so instrumented code needs no
+    branches; they just measure nothing.
+    """
+
+    def __init__(self, enabled=None, trace_allocations=None):
+        """
+        Initialize the profiler.
+
+        Args:
+            enabled (bool, optional): Record stages (default: PENMAN_PROFILE environment variable)
+            trace_allocations (bool, optional): Track peak traced allocations per stage with
+                tracemalloc, which slows the run down (default: PENMAN_PROFILE_ALLOCATIONS)
+        """
+        if enabled is None:
+            enabled = _env_flag(PROFILE_ENV)
+        if trace_allocations is None:
+            trace_allocations = _env_flag(PROFILE_ALLOCATIONS_ENV)
+        self.enabled = enabled
+        self.trace_allocations = enabled and trace_allocations
+        self.stages = []
+        self._process_peak_rss_mb = None  # kept here because resetting the stage peak clears ru_maxrss
+
+    @contextmanager
+    def stage(self, name, rows=None):
+        """
+        Measure the enclosed block as one stage.
+
+        The stage's peak RSS is its own: on Linux the kernel's high-water mark is reset at the
+        start of the stage (/proc/self/clear_refs). Elsewhere it is only known when the stage
+        raises the process peak, and is None otherwise. Stages should not be nested.
+
+        Args:
+            name (str): Stage name
+            rows (int, optional): Number of rows processed (can also be set on the yielded record)
+
+        Yields:
+            StageRecord: The record of the stage
+        """
+        record = StageRecord(name, rows)
+        if not self.enabled:
+            yield record
+            return
+
+        started_tracing = self.trace_allocations and not tracemalloc.is_tracing()
+        if started_tracing:
+            tracemalloc.start()
+        elif self.trace_allocations:
+            tracemalloc.reset_peak()
+        rss_before = self._update_process_peak(_peak_rss_mb())
+        rss_reset = _reset_peak_rss()
+        wall_start, cpu_start = time.perf_counter(), time.process_time()
+        try:
+            yield record
+        finally:
+            record.wall_seconds = time.perf_counter() - wall_start
+            record.cpu_seconds = time.process_time() - cpu_start
+            rss_after = _peak_rss_mb()
+            if rss_after is not None and (rss_reset or rss_after > rss_before):
+                record.peak_rss_mb = rss_after
+            self._update_process_peak(rss_after)
+            if self.trace_allocations:
+                record.peak_allocated_mb = tracemalloc.get_traced_memory()[1] / 2 ** 20
+                if started_tracing:
+                    tracemalloc.stop()
+            self.stages.append(record)
+
+    def to_dict(self):
+        """Return all recorded stages plus run totals as a dict."""
+        return {
+            'stages': [record.to_dict() for record in self.stages],
+            'total_wall_seconds': sum(record.wall_seconds for record in self.stages),
+            'total_cpu_seconds': sum(record.cpu_seconds for record in self.stages),
+            'peak_rss_mb': self._update_process_peak(_peak_rss_mb()),
+        }
+
+    def _update_process_peak(self, rss_mb):
+        """Fold a peak RSS reading into the process-wide peak and return the latter."""
+        if rss_mb is not None:
+            self._process_peak_rss_mb = max(rss_mb, self._process_peak_rss_mb or 0)
+        return self._process_peak_rss_mb
+
+    def to_json(self, path):
+        """
+        Write the recorded stages to a JSON file.
+
+        Args:
+            path (str): Output path
+        """
+        with open(path, 'w') as f:
+            json.dump(self.to_dict(), f, indent=2)
+
+    def summary(self):
+        """Return a human-readable table of the recorded stages."""
+        lines = [f"{'Stage':<24}{'Rows':>12}{'Wall (s)':>11}{'CPU (s)':>10}{'Rows/s':>13}"
+                 f"{'Peak RSS (MB)':>15}{'Peak alloc (MB)':>17}"]
+        for stage in self.to_dict()['stages']:
+            lines.append(f"{stage['stage']:<24}{_fmt(stage['rows'], '{:d}'):>12}"
+                         f"{stage['wall_seconds']:>11.3f}{stage['cpu_seconds']:>10.3f}"
+                         f"{_fmt(stage['rows_per_second'], '{:.0f}'):>13}"
+                         f"{_fmt(stage['peak_rss_mb'], '{:.1f}'):>15}"
+                         f"{_fmt(stage['peak_allocated_mb'], '{:.1f}'):>17}")
+        return '\n'.join(lines)
+
+    def report(self, json_path=None):
+        """
+        Print the summary and write the JSON report, if profiling is enabled.
+
+        Args:
+            json_path (str, optional): JSON output path (default: PENMAN_PROFILE_JSON environment variable)
+        """
+        if not self.enabled:
+            return
+        print("\nPipeline profile:")
+        print(self.summary())
+        json_path = json_path or os.environ.get(PROFILE_JSON_ENV)
+        if json_path:
+            self.to_json(json_path)
+
+
+def _env_flag(name):
+    """True when environment variable `name` is set to a non-false value."""
+    return os.environ.get(name, '').strip().lower() not in ('', '0', 'false', 'no', 'off')
+
+
+def _reset_peak_rss():
+    """Reset the kernel's peak RSS (Linux only); True on success."""
+    try:
+        with open('/proc/self/clear_refs', 'w') as f:
+            f.write('5')
+        return True
+    except OSError:
+        return False
+
+
+def _peak_rss_mb():
+    """Peak resident set size since start or the last reset in MB, or None where unavailable."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 2 ** 20 if sys.platform == 'darwin' else peak / 2 ** 10  # bytes on macOS, KB elsewhere
+
+
+def _fmt(value, spec):
+    """Format an optional value for the summary table."""
+    return '-' if value is None else spec.format(value)
@@ -0,0 +1,151 @@
+"""
+----------------------------------------------------------------------
+Project: Penman Evaporation Calculator
+Filename: parquet_io
+Author: Roy Elkayam
+Created: 2026-10-17
+Description: Parquet/Arrow storage for raw 10-minute data and daily evaporation results
+----------------------------------------------------------------------
+"""
+
+import pandas as pd
+from ims_data import DAILY_AGGREGATIONS, parse_ims_datetime
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # pyarrow is optional; only needed for Parquet storage
+    pa = pq = None
+
+# Row groups of about one month of 10-minute data, so date filters can skip whole row groups
+RAW_ROW_GROUP_SIZE = 144 * 31
+DAILY_ROW_GROUP_SIZE = 366
+
+
+def _raw_schema():
+    """Arrow schema of the raw 10-minute data: typed timestamps and float observations."""
+    return pa.schema([('datetime', pa.timestamp('ns'))] + [(name, pa.float64()) for name in DAILY_AGGREGATIONS])
+
+
+def write_raw_parquet(df, path, row_group_size=RAW_ROW_GROUP_SIZE):
+    """
+    Write raw 10-minute observations (IMS layout) to a Parquet file with typed columns.
+
+    Rows are sorted by time, so the per-row-group timestamp statistics let readers skip
+    everything outside a requested date range.
+
+    Args:
+        df (pandas.DataFrame): Raw observations with a 'datetime' column (IMS strings or datetime64)
+        path (str): Output Parquet path
+        row_group_size (int): Rows per row group
+    """
+    _require_pyarrow()
+    df = df[['datetime', *DAILY_AGGREGATIONS]].copy()
+    df['datetime'] = parse_ims_datetime(df['datetime'])
+    df = df.sort_values('datetime', kind='stable')
+    table = pa.Table.from_pandas(df, schema=_raw_schema(), preserve_index=False)
+    pq.write_table(table, path, row_group_size=row_group_size)
+
+
+def convert_csv_to_parquet(csv_path, parquet_path, chunksize=500_000, row_group_size=RAW_ROW_GROUP_SIZE):
+    """
+    Convert a raw IMS CSV to Parquet chunk by chunk, without loading the whole file.
+
+    The CSV must be in chronological order, as IMS exports are.
+
+    Args:
+        csv_path (str): Raw IMS CSV path
+        parquet_path (str): Output Parquet path
+        chunksize (int): Number of CSV rows read per chunk
+        row_group_size (int): Rows per row group
+
+    Returns:
+        int: Number of rows written
+    """
+    _require_pyarrow()
+    n_rows = 0
+    with pq.ParquetWriter(parquet_path, _raw_schema()) as writer:
+        for chunk in pd.read_csv(csv_path, chunksize=chunksize, usecols=['datetime', *DAILY_AGGREGATIONS]):
+            chunk['datetime'] = parse_ims_datetime(chunk['datetime'])
+            table = pa.Table.from_pandas(chunk[['datetime', *DAILY_AGGREGATIONS]], schema=_raw_schema(),
+                                         preserve_index=False)
+            writer.write_table(table, row_group_size=row_group_size)
+            n_rows += len(chunk)
+    return n_rows
+
+
+def read_raw_parquet(path, columns=None, start=None, end=None):
+    """
+    Read raw 10-minute observations from Parquet, optionally pruned to columns and a date range.
+
+    Only the requested columns and the row groups overlapping [start, end) are read. The
+    result has the raw IMS layout with a typed 'datetime' column, so it can be passed to
+    data_preparation without any timestamp parsing.
+
+    Args:
+        path (str): Parquet path (file or dataset directory)
+        columns (list, optional): Observation columns to read (default: all)
+        start (str or datetime-like, optional): First timestamp to include
+        end (str or datetime-like, optional): First timestamp to exclude
+
+    Returns:
+        pandas.DataFrame: Raw observations with a datetime64 'datetime' column
+    """
+    _require_pyarrow()
+    read_columns = None if columns is None else ['datetime', *[c for c in columns if c != 'datetime']]
+    table = pq.read_table(path, columns=read_columns, filters=_date_filters('datetime', start, end))
+    return table.to_pandas()
+
+
+def write_daily_parquet(daily_df, path, row_group_size=DAILY_ROW_GROUP_SIZE):
+    """
+    Write daily aggregates / evaporation results (data_preparation layout) to Parquet.
+
+    Args:
+        daily_df (pandas.DataFrame): Daily results indexed by date
+        path (str): Output Parquet path
+        row_group_size (int): Rows per row group
+    """
+    _require_pyarrow()
+    # The 'datetime' column duplicates the index; the index alone is stored
+    df = daily_df.drop(columns='datetime', errors='ignore').sort_index()
+    df.index = df.index.rename('datetime')
+    pq.write_table(pa.Table.from_pandas(df), path, row_group_size=row_group_size)
+
+
+def read_daily_parquet(path, columns=None, start=None, end=None):
+    """
+    Read daily results from Parquet, optionally pruned to columns and a date range [start, end).
+
+    Args:
+        path (str): Parquet path
+        columns (list, optional): Columns to read (default: all)
+        start (str or datetime-like, optional): First day to include
+        end (str or datetime-like, optional): First day to exclude
+
+    Returns:
+        pandas.DataFrame: Daily results in the data_preparation layout (date index plus 'datetime' column)
+    """
+    _require_pyarrow()
+    read_columns = None if columns is None else ['datetime', *[c for c in columns if c != 'datetime']]
+    df = pq.read_table(path, columns=read_columns, filters=_date_filters('datetime', start, end)).to_pandas()
+    if 'datetime' in df.columns:
+        df = df.set_index('datetime')
+    df['datetime'] = df.index
+    return df
+
+
+def _date_filters(column, start, end):
+    """Build a pyarrow filter list for start <= column < end, or None for no filtering."""
+    filters = []
+    if start is not None:
+        filters.append((column, '>=', pd.Timestamp(start)))
+    if end is not None:
+        filters.append((column, '<', pd.Timestamp(end)))
+    return filters or None
+
+
+def _require_pyarrow():
+    """Raise a helpful error when pyarrow is not installed."""
+    if pa is None:
+        raise ImportError("Parquet support requires pyarrow (pip install pyarrow)")
@@ -11,11 +11,27 @@ following: Valiantzas, J.D. (2006). Simplified versions for the Penman evaporati
 """
 
 import math
+from functools import lru_cache
 import numpy as np
 from datetime import datetime
 import pandas as pd
 from datetime import datetime
 
+try:
+    import numba
+except ImportError:  # Numba is optional; the NumPy kernel is used without it
+    numba = None
+
+# Smallest output size for which backend='auto' picks the compiled kernel
+NUMBA_MIN_SIZE = 100_000
+
+# Wind function coefficients (a_u, b_u) of Eq. 32; extend with register_wind_function
+WIND_FUNCTIONS = {
+    'penman1948': (1, 0.536),
+    'penman1956': (0.5, 0.536),
+    'linacre1993': (0, 0.54),
+}
+
 
 class PenmanEvaporation:
     """
@@ -37,6 +53,9 @@ class PenmanEvaporation:
         self.elevation = elevation
         self.albedo = albedo
 
+        # Ra and N depend only on latitude and month, so tabulate them once (index 0 = January)
+        self.ra_table, self.n_table = _ra_n_table(self.latitude_rad)
+
     def calculate_daily_evaporation(self, datetime_obj, t_mean, rh_mean, rs, u=None,
                                     wind_function='penman1948'):
         """
@@ -61,14 +80,7 @@ class PenmanEvaporation:
         if u is not None:
             # Use simplified Penman equation with wind data (Eq. 32 in paper)
             # Determine wind function coefficients
-            if wind_function == 'penman1948':
-                a_u, b_u = 1, 0.536
-            elif wind_function == 'penman1956':
-                a_u, b_u = 0.5, 0.536
-            elif wind_function == 'linacre1993':
-                a_u, b_u = 0, 0.54
-            else:
-                raise ValueError("Invalid wind function specified")
+            a_u, b_u = _wind_function_coefficients(wind_function)
 
             # Simplified Penman equation with wind data (Eq. 32)
             term1 = 0.051 * (1 - self.albedo) * rs * math.sqrt(t_mean + 9.5)
@@ -90,6 +102,150 @@ class PenmanEvaporation:
 
         return max(0, e_pen)  # Evaporation can't be negative
 
+    def calculate_daily_evaporation_batch(self, dates, t_mean, rh_mean, rs, u=None,
+                                          wind_function='penman1948', backend='auto'):
+        """
+        Calculate daily potential evaporation for many days in a single vectorized pass.
+
+        Array counterpart of calculate_daily_evaporation: all inputs are evaluated at once
+        with NumPy instead of one Python call per day. Days with missing inputs (NaN)
+        yield NaN rather than being clamped to zero.
+
+        Args:
+            dates (array-like): Dates of calculation (datetime-like values or '%Y-%m-%d' strings)
+            t_mean (array-like): Mean air temperature (°C)
+            rh_mean (array-like): Mean relative humidity (%)
+            rs (array-like): Solar radiation (MJ/m²/day)
+            u (array-like, optional): Wind speed at 2m height (m/s)
+            wind_function (str): Wind function to use ('penman1948', 'penman1956', 'linacre1993')
+            backend (str): Kernel to use ('auto', 'numpy' or 'numba'); 'auto' picks Numba for
+                large inputs when it is installed
+
+        Returns:
+            numpy.ndarray: Potential evaporation (mm/day) for each day
+        """
+        ra, N = self._calculate_ra_and_N_batch(dates)
+
+        if u is not None:
+            a_u, b_u = _wind_function_coefficients(wind_function)
+            return _penman_evaporation(ra, rs, t_mean, rh_mean, u, self.albedo,
+                                       self.elevation, a_u, b_u, backend=backend)
+        return _penman_evaporation(ra, rs, t_mean, rh_mean, None, self.albedo,
+                                   self.elevation, backend=backend)
+
+    def calculate_daily_evaporation_fallback(self, dates, t_mean, rh_mean, rs, u,
+                                             wind_function='penman1948', backend='auto'):
+        """
+        Calculate daily potential evaporation choosing the equation per day from wind availability.
+
+        Both equations are evaluated vectorized and the result is selected element-wise:
+        the wind equation (Eq. 32) where the wind speed is finite, and the no-wind equation
+        (Eq. 33) elsewhere, so days with a missing anemometer reading still get an estimate.
+
+        Args:
+            dates (array-like): Dates of calculation (datetime-like values or '%Y-%m-%d' strings)
+            t_mean (array-like): Mean air temperature (°C)
+            rh_mean (array-like): Mean relative humidity (%)
+            rs (array-like): Solar radiation (MJ/m²/day)
+            u (array-like): Wind speed at 2m height (m/s), NaN where missing
+            wind_function (str): Wind function to use ('penman1948', 'penman1956', 'linacre1993')
+            backend (str): Kernel to use ('auto', 'numpy' or 'numba')
+
+        Returns:
+            tuple: (potential evaporation in mm/day, boolean array that is True where Eq. 32 was used)
+        """
+        ra, N = self._calculate_ra_and_N_batch(dates)
+        a_u, b_u = _wind_function_coefficients(wind_function)
+        return _penman_evaporation_fallback(ra, rs, t_mean, rh_mean, u, self.albedo, self.elevation,
+                                            a_u, b_u, backend=backend)
+
+    def calculate_daily_evaporation_variants(self, dates, t_mean, rh_mean, rs, u=None, wind_functions=None,
+                                             include_no_wind=True):
+        """
+        Calculate daily potential evaporation for several wind functions and the no-wind equation at once.
+
+        Ra, the radiation terms and the humidity factor are computed once and shared by all
+        variants, so this costs little more than a single calculate_daily_evaporation_batch.
+
+        Args:
+            dates (array-like): Dates of calculation (datetime-like values or '%Y-%m-%d' strings)
+            t_mean (array-like): Mean air temperature (°C)
+            rh_mean (array-like): Mean relative humidity (%)
+            rs (array-like): Solar radiation (MJ/m²/day)
+            u (array-like, optional): Wind speed at 2m height (m/s); without it only Eq. 33 is evaluated
+            wind_functions (list, optional): Wind function names for Eq. 32 (default: all of
+                WIND_FUNCTIONS when `u` is given)
+            include_no_wind (bool): Add the no-wind equation (Eq. 33) as the last column
+
+        Returns:
+            numpy.ndarray: Potential evaporation (mm/day) shaped (days, variants), with one column
+                per wind function in order, then the no-wind column
+        """
+        if wind_functions is None:
+            wind_functions = list(WIND_FUNCTIONS) if u is not None else []
+        if wind_functions and u is None:
+            raise ValueError("Wind functions require wind speed data")
+        coefficients = np.array([_wind_function_coefficients(name) for name in wind_functions],
+                                dtype=float).reshape(-1, 2)
+
+        ra, N = self._calculate_ra_and_N_batch(dates)
+        return _penman_evaporation_variants(ra, rs, t_mean, rh_mean, u, self.albedo, self.elevation,
+                                            coefficients[:, 0], coefficients[:, 1], include_no_wind)
+
+    def calculate_daily_evaporation_sweep(self, dates, t_mean, rh_mean, rs, u=None, albedos=None, elevations=None,
+                                          wind_functions=None, include_no_wind=True):
+        """
+        Calculate daily potential evaporation over a grid of albedo, elevation and wind-function choices.
+
+        Albedo and elevation enter Eqs. 32/33 linearly, so each variant is split into a
+        parameter-free part (computed once per day with Ra, the humidity terms and the wind
+        function) plus albedo × radiation and elevation terms that are broadcast over the
+        parameter vectors. A sweep of many parameter values costs little more than writing
+        its output.
+
+        Args:
+            dates (array-like): Dates of calculation (datetime-like values or '%Y-%m-%d' strings)
+            t_mean (array-like): Mean air temperature (°C), shaped (days,)
+            rh_mean (array-like): Mean relative humidity (%), shaped (days,)
+            rs (array-like): Solar radiation (MJ/m²/day), shaped (days,)
+            u (array-like, optional): Wind speed at 2m height (m/s), shaped (days,)
+            albedos (array-like, optional): Surface albedos to sweep (default: the calculator's albedo)
+            elevations (array-like, optional): Elevations to sweep in meters (default: the calculator's elevation)
+            wind_functions (list, optional): Wind function names (default: all of WIND_FUNCTIONS when `u` is given)
+            include_no_wind (bool): Add the no-wind equation (Eq. 33) as the last variant
+
+        Returns:
+            numpy.ndarray: Potential evaporation (mm/day) shaped (albedos, elevations, variants, days);
+                variants are ordered as in calculate_daily_evaporation_variants
+        """
+        albedos = np.atleast_1d(np.asarray(self.albedo if albedos is None else albedos, dtype=float))
+        elevations = np.atleast_1d(np.asarray(self.elevation if elevations is None else elevations, dtype=float))
+        if wind_functions is None:
+            wind_functions = list(WIND_FUNCTIONS) if u is not None else []
+        if wind_functions and u is None:
+            raise ValueError("Wind functions require wind speed data")
+        coefficients = np.array([_wind_function_coefficients(name) for name in wind_functions],
+                                dtype=float).reshape(-1, 2)
+
+        # Parameter-free part: every variant with albedo 0 and elevation 0, shaped (variants, days)
+        ra, N = self._calculate_ra_and_N_batch(dates)
+        base = _penman_evaporation_variants(ra, rs, t_mean, rh_mean, u, 0.0, 0.0, coefficients[:, 0],
+                                            coefficients[:, 1], include_no_wind, clamp=False).T
+
+        # Albedo only scales term1 of Eq. 32 (Eq. 33 has none): -0.051 * albedo * rs * sqrt(T + 9.5)
+        with np.errstate(invalid='ignore'):
+            rs_sqrt_t = np.asarray(rs, dtype=float) * np.sqrt(np.asarray(t_mean, dtype=float) + 9.5)
+        albedo_slope = np.where(np.arange(base.shape[0]) < len(wind_functions), 0.051, 0.0)
+        albedo_term = albedo_slope[:, None] * rs_sqrt_t  # (variants, days)
+
+        # The output is the only full-size array: every broadcast step writes into it in place
+        out = np.empty((albedos.size, elevations.size) + base.shape)
+        np.multiply(albedos[:, None, None, None], albedo_term, out=out)
+        np.subtract(base, out, out=out)
+        np.add(out, 0.00012 * elevations[None, :, None, None], out=out)  # Elevation correction (Eq. 36)
+        np.maximum(out, 0, out=out)  # Evaporation can't be negative
+        return out
+
     def _calculate_ra_and_N(self, date):
         """
         Calculate extraterrestrial radiation (Ra) and daylight hours (N) using simplified equations.
@@ -102,20 +258,575 @@ class PenmanEvaporation:
             tuple: (Ra in MJ/m²/day, N in hours)
         """
         if isinstance(date, str):
-            date = datetime.strptime(date, '%Y-%m-%d').date()
+            month_index = _parse_month(date) - 1
+        else:
+            month_index = date.month - 1
+        return float(self.ra_table[month_index]), float(self.n_table[month_index])
+
+    def _calculate_ra_and_N_batch(self, dates):
+        """
+        Vectorized version of _calculate_ra_and_N: gathers Ra and N from the monthly table.
+
+        Args:
+            dates (array-like): Dates for calculation
+
+        Returns:
+            tuple: (Ra array in MJ/m²/day, N array in hours)
+        """
+        month_index = _months_from_dates(dates) - 1
+        return self.ra_table[month_index], self.n_table[month_index]
+
+
+@lru_cache(maxsize=4096)
+def _parse_month(date_str):
+    """
+    Parse a '%Y-%m-%d' date string and return its month, memoized for repeated dates.
+
+    Args:
+        date_str (str): Date string
+
+    Returns:
+        int: Month number (1-12)
+    """
+    return datetime.strptime(date_str, '%Y-%m-%d').month
+
+
+def _months_from_dates(dates):
+    """
+    Extract month numbers from an array of dates without building Python datetime objects.
+
+    numpy datetime64 arrays, pandas DatetimeIndex and datetime Series are handled with
+    pure array arithmetic. Other inputs (e.g. '%Y-%m-%d' strings) are parsed in bulk,
+    once per distinct value.
+
+    Args:
+        dates (array-like): Dates as datetime64 values, a DatetimeIndex/Series or strings
+
+    Returns:
+        numpy.ndarray: Month numbers (1-12) with the shape of `dates`
+    """
+    if isinstance(dates, pd.DatetimeIndex):
+        return dates.month.to_numpy()
+    if isinstance(dates, pd.Series) and pd.api.types.is_datetime64_any_dtype(dates.dtype):
+        return dates.dt.month.to_numpy()
+
+    dates = np.asarray(dates)
+    if not np.issubdtype(dates.dtype, np.datetime64):
+        # Parse each distinct value once and scatter the result back
+        codes, unique_dates = pd.factorize(dates.ravel())
+        date_format = '%Y-%m-%d' if dates.dtype.kind == 'U' else None
+        unique_dates = pd.to_datetime(unique_dates, format=date_format).to_numpy()
+        dates = unique_dates[codes].reshape(dates.shape)
+
+    return dates.astype('datetime64[M]').astype(np.int64) % 12 + 1
 
-        month = date.month
-        phi = self.latitude_rad
 
-        # Calculate daylight hours N (Eq. 34)
-        N = 4 * phi * math.sin(0.53 * month - 1.65) + 12
+def _ra_n_table(latitude_rad):
+    """
+    Tabulate extraterrestrial radiation (Ra) and daylight hours (N) for the 12 months.
+    Eqs. 34 and 35 in the paper.
+
+    Args:
+        latitude_rad (float or array-like): Latitude(s) in radians
+
+    Returns:
+        tuple: (Ra table in MJ/m²/day, N table in hours), each shaped (12,) + latitude shape
+    """
+    phi = np.asarray(latitude_rad, dtype=float)
+    month = np.arange(1, 13).reshape((12,) + (1,) * phi.ndim)
+
+    # Calculate daylight hours N (Eq. 34)
+    N = 4 * phi * np.sin(0.53 * month - 1.65) + 12
+
+    # Calculate extraterrestrial radiation Ra (Eq. 35)
+    temperate = np.abs(phi) > 23.5 * math.pi / 180
+    Ra = np.where(temperate,
+                  3 * N * np.sin(0.131 * N - 0.95 * phi),  # Temperate zone
+                  118 * N ** 2 * np.sin(0.131 * N - 0.2 * phi))  # Tropical zone
+
+    return Ra, N
+
+
+class MultiStationPenmanEvaporation:
+    """
+    Simplified Penman evaporation for a network of stations evaluated as one stations × days matrix.
+    Each distinct latitude gets a single Ra/N table shared by all stations located on it.
+    """
+
+    def __init__(self, latitudes_deg, elevations=0, albedos=0.08):
+        """
+        Initialize the multi-station Penman evaporation calculator.
+
+        Args:
+            latitudes_deg (array-like): Latitude of each station in decimal degrees
+            elevations (float or array-like): Elevation of each station above sea level in meters (default 0)
+            albedos (float or array-like): Surface albedo of each station (default 0.08, open water)
+        """
+        self.latitudes_rad = np.radians(np.asarray(latitudes_deg, dtype=float).ravel())
+        n_stations = self.latitudes_rad.size
+        self.elevations = np.broadcast_to(np.asarray(elevations, dtype=float), (n_stations,)).copy()
+        self.albedos = np.broadcast_to(np.asarray(albedos, dtype=float), (n_stations,)).copy()
+
+        # One Ra/N table per distinct latitude, shaped (12, n_latitudes)
+        unique_latitudes, self._table_column = np.unique(self.latitudes_rad, return_inverse=True)
+        self.ra_table, self.n_table = _ra_n_table(unique_latitudes)
+
+    @property
+    def n_stations(self):
+        """int: Number of stations handled by the calculator."""
+        return self.latitudes_rad.size
+
+    def calculate_daily_evaporation(self, dates, t_mean, rh_mean, rs, u=None,
+                                    wind_function='penman1948', backend='auto'):
+        """
+        Calculate daily potential evaporation for all stations and days at once.
+
+        Met inputs are stations × days matrices (anything broadcastable to that shape).
+        Days with missing inputs (NaN) yield NaN.
+
+        Args:
+            dates (array-like): Dates shared by all stations (days,) or per station (stations, days)
+            t_mean (array-like): Mean air temperature (°C)
+            rh_mean (array-like): Mean relative humidity (%)
+            rs (array-like): Solar radiation (MJ/m²/day)
+            u (array-like, optional): Wind speed at 2m height (m/s)
+            wind_function (str): Wind function to use ('penman1948', 'penman1956', 'linacre1993')
+            backend (str): Kernel to use ('auto', 'numpy' or 'numba'); 'auto' picks Numba for
+                large inputs when it is installed
+
+        Returns:
+            numpy.ndarray: Potential evaporation (mm/day), shaped stations × days
+        """
+        ra = self._calculate_ra(dates)
+        albedos = self.albedos[:, np.newaxis]
+        elevations = self.elevations[:, np.newaxis]
+
+        if u is not None:
+            a_u, b_u = _wind_function_coefficients(wind_function)
+            return _penman_evaporation(ra, rs, t_mean, rh_mean, u, albedos, elevations, a_u, b_u,
+                                       backend=backend)
+        return _penman_evaporation(ra, rs, t_mean, rh_mean, None, albedos, elevations, backend=backend)
+
+    def _calculate_ra(self, dates):
+        """
+        Gather extraterrestrial radiation (Ra) for every station and day from the Ra tables.
+
+        Args:
+            dates (array-like): Dates shaped (days,) or (stations, days)
+
+        Returns:
+            numpy.ndarray: Ra in MJ/m²/day, shaped stations × days
+        """
+        month_index = np.atleast_1d(_months_from_dates(dates)) - 1
+        if month_index.ndim == 1:
+            month_index = month_index[np.newaxis, :]
+        return self.ra_table[month_index, self._table_column[:, np.newaxis]]
+
+
+class GridPenmanEvaporation:
+    """
+    Simplified Penman evaporation on a regular lat/lon grid (time × lat × lon cubes).
+    Ra and N vary only with latitude row and month, so they are tabulated per row and
+    broadcast across longitudes.
+    """
+
+    def __init__(self, latitudes_deg, elevation=0, albedo=0.08):
+        """
+        Initialize the gridded Penman evaporation calculator.
+
+        Args:
+            latitudes_deg (array-like): Latitude of each grid row in decimal degrees, shaped (lat,)
+            elevation (float or array-like): Elevation above sea level in meters, scalar or
+                a (lat, lon) DEM (default 0)
+            albedo (float or array-like): Surface albedo, scalar or (lat, lon) (default 0.08)
+        """
+        self.latitudes_rad = np.radians(np.asarray(latitudes_deg, dtype=float).ravel())
+        self.elevation = np.asarray(elevation, dtype=float)
+        self.albedo = np.asarray(albedo, dtype=float)
+
+        # Ra/N tables shaped (12, lat)
+        self.ra_table, self.n_table = _ra_n_table(self.latitudes_rad)
+
+    def calculate_daily_evaporation(self, dates, t_mean, rh_mean, rs, u=None,
+                                    wind_function='penman1948', backend='auto'):
+        """
+        Calculate daily potential evaporation for a time × lat × lon cube.
+
+        Args:
+            dates (array-like): Date of each time step, shaped (time,)
+            t_mean (array-like): Mean air temperature (°C), shaped (time, lat, lon)
+            rh_mean (array-like): Mean relative humidity (%), shaped (time, lat, lon)
+            rs (array-like): Solar radiation (MJ/m²/day), shaped (time, lat, lon)
+            u (array-like, optional): Wind speed at 2m height (m/s), shaped (time, lat, lon)
+            wind_function (str): Wind function to use ('penman1948', 'penman1956', 'linacre1993')
+            backend (str): Kernel to use ('auto', 'numpy' or 'numba'); 'auto' picks Numba for
+                large inputs when it is installed
+
+        Returns:
+            numpy.ndarray: Potential evaporation (mm/day), shaped (time, lat, lon)
+        """
+        month_index = np.atleast_1d(_months_from_dates(dates)) - 1
+        ra = self.ra_table[month_index][:, :, np.newaxis]  # (time, lat, 1)
+
+        if u is not None:
+            a_u, b_u = _wind_function_coefficients(wind_function)
+            return _penman_evaporation(ra, rs, t_mean, rh_mean, u, self.albedo, self.elevation, a_u, b_u,
+                                       backend=backend)
+        return _penman_evaporation(ra, rs, t_mean, rh_mean, None, self.albedo, self.elevation,
+                                   backend=backend)
+
+
+class IncrementalPenmanEvaporation:
+    """
+    Simplified Penman evaporation of one series that keeps its equation terms cached, for
+    interactive what-if sessions that change one input at a time.
+
+    Each cached array is a node of a small dependency graph (NODE_DEPENDENCIES). Changing an
+    input recomputes only the nodes downstream of it: a new albedo recomputes term1 and the
+    result, a new elevation only the elevation correction and the result, and a change to a
+    few days' inputs patches just those days in the affected nodes.
+    """
+
+    # Node -> inputs/nodes it is computed from, in evaluation order
+    NODE_DEPENDENCIES = {
+        'rs_sqrt_t': ('rs', 't_mean'),
+        'humidity': ('t_mean', 'rh_mean'),
+        'term1': ('albedo', 'rs_sqrt_t'),
+        'term2': ('rs', 'ra'),
+        'term3': ('humidity', 'u', 'wind_function'),
+        'elevation_correction': ('elevation',),
+        'evaporation': ('term1', 'term2', 'term3', 'elevation_correction'),
+    }
+
+    def __init__(self, penman, dates, t_mean, rh_mean, rs, u=None, wind_function='penman1948'):
+        """
+        Initialize the calculator; terms are computed on first access.
+
+        Args:
+            penman (PenmanEvaporation): Calculator providing latitude, initial albedo and elevation
+            dates (array-like): Dates of calculation (datetime-like values or '%Y-%m-%d' strings)
+            t_mean (array-like): Mean air temperature (°C)
+            rh_mean (array-like): Mean relative humidity (%)
+            rs (array-like): Solar radiation (MJ/m²/day)
+            u (array-like, optional): Wind speed at 2m height (m/s); without it Eq. 33 is used
+            wind_function (str): Wind function to use (a key of WIND_FUNCTIONS)
+        """
+        self.albedo = penman.albedo
+        self.elevation = penman.elevation
+        self.use_wind = u is not None
+        self.wind_coefficients = _wind_function_coefficients(wind_function)
+        self.ra = penman._calculate_ra_and_N_batch(dates)[0]
+
+        self.inputs = {'t_mean': np.array(t_mean, dtype=float), 'rh_mean': np.array(rh_mean, dtype=float),
+                       'rs': np.array(rs, dtype=float)}
+        if self.use_wind:
+            self.inputs['u'] = np.array(u, dtype=float)
+
+        self.nodes = {}
+        self._stale = set(self.NODE_DEPENDENCIES)
+        self.last_recomputed = []  # nodes recomputed by the last update or refresh
+
+    @property
+    def evaporation(self):
+        """numpy.ndarray: Potential evaporation (mm/day), recomputing only stale terms."""
+        self._refresh()
+        return self.nodes['evaporation']
+
+    def term(self, name):
+        """
+        Return a cached term ('term1', 'term2', 'term3', 'elevation_correction', ...).
+
+        Args:
+            name (str): Node name (a key of NODE_DEPENDENCIES)
+
+        Returns:
+            numpy.ndarray or float: Current value of the term
+        """
+        self._refresh()
+        return self.nodes[name]
+
+    def set_albedo(self, albedo):
+        """Change the surface albedo (invalidates term1)."""
+        self.albedo = albedo
+        self._invalidate({'albedo'})
+
+    def set_elevation(self, elevation):
+        """Change the elevation in meters (invalidates the elevation correction)."""
+        self.elevation = elevation
+        self._invalidate({'elevation'})
+
+    def set_wind_function(self, wind_function):
+        """Change the wind function (invalidates term3)."""
+        self.wind_coefficients = _wind_function_coefficients(wind_function)
+        self._invalidate({'wind_function'})
+
+    def update_days(self, index, **inputs):
+        """
+        Change the inputs of some days and patch only those days in the affected terms.
+
+        Args:
+            index (int, slice or array-like): Days to change
+            **inputs: New values for 't_mean', 'rh_mean', 'rs' and/or 'u' at `index`
+        """
+        for name, values in inputs.items():
+            if name not in self.inputs:
+                raise ValueError(f"Unknown input '{name}'")
+            self.inputs[name][index] = values
+
+        self._refresh()
+        self.last_recomputed = []
+        changed = set(inputs)
+        for node, dependencies in self.NODE_DEPENDENCIES.items():
+            if changed.intersection(dependencies):
+                self.nodes[node][index] = self._evaluate(node, index)
+                self.last_recomputed.append(node)
+                changed.add(node)
+
+    def _invalidate(self, changed):
+        """Mark every node downstream of the changed inputs as stale."""
+        changed = set(changed)
+        for node, dependencies in self.NODE_DEPENDENCIES.items():
+            if changed.intersection(dependencies):
+                self._stale.add(node)
+                changed.add(node)
+
+    def _refresh(self):
+        """Recompute the stale nodes over the whole series, in dependency order."""
+        if not self._stale:
+            return
+        self.last_recomputed = [node for node in self.NODE_DEPENDENCIES if node in self._stale]
+        for node in self.last_recomputed:
+            self.nodes[node] = self._evaluate(node, slice(None))
+        self._stale.clear()
+
+    def _evaluate(self, node, index):
+        """Compute one node for the days at `index` from its (up-to-date) dependencies."""
+        inputs, nodes = self.inputs, self.nodes
+        with np.errstate(invalid='ignore', divide='ignore'):
+            if node == 'rs_sqrt_t':
+                return inputs['rs'][index] * np.sqrt(inputs['t_mean'][index] + 9.5)
+            if node == 'humidity':
+                return (inputs['t_mean'][index] + 20) * (1 - inputs['rh_mean'][index] / 100)
+            if node == 'term1':
+                # Eq. 32 / Eq. 33 radiation term
+                factor = 0.051 * (1 - self.albedo) if self.use_wind else 0.047
+                return factor * nodes['rs_sqrt_t'][index]
+            if node == 'term2':
+                return 2.4 * (inputs['rs'][index] / self.ra[index]) ** 2
+            if node == 'term3':
+                if self.use_wind:
+                    a_u, b_u = self.wind_coefficients
+                    return 0.052 * nodes['humidity'][index] * (a_u - 0.38 + b_u * inputs['u'][index])
+                return 0.09 * nodes['humidity'][index]
+            if node == 'elevation_correction':
+                return 0.00012 * self.elevation  # Eq. 36
+            e_pen = (nodes['term1'][index] - nodes['term2'][index] + nodes['term3'][index]
+                     + nodes['elevation_correction'])
+            return np.maximum(e_pen, 0)  # Evaporation can't be negative
+
+
+def _wind_function_coefficients(wind_function):
+    """
+    Look up the (a_u, b_u) coefficients of a named wind function.
+
+    Args:
+        wind_function (str): Wind function name (a key of WIND_FUNCTIONS)
+
+    Returns:
+        tuple: (a_u, b_u)
+    """
+    if wind_function not in WIND_FUNCTIONS:
+        raise ValueError("Invalid wind function specified")
+    return WIND_FUNCTIONS[wind_function]
+
+
+def register_wind_function(name, a_u, b_u):
+    """
+    Register a custom wind function f(u) = a_u + b_u * u for use by name in every calculator.
+
+    Args:
+        name (str): Wind function name (an existing name is overwritten)
+        a_u (float): Wind function coefficient a_u
+        b_u (float): Wind function coefficient b_u
+    """
+    WIND_FUNCTIONS[name] = (float(a_u), float(b_u))
+
+
+def _penman_evaporation(ra, rs, t_mean, rh_mean, u, albedo, elevation, a_u=None, b_u=None,
+                        backend='auto'):
+    """
+    Evaluate the simplified Penman equation on NumPy arrays (Eqs. 32/33 with Eq. 36).
+
+    All arguments broadcast against each other, so the same kernel serves single
+    stations, station networks and grids.
+
+    Args:
+        ra (array-like): Extraterrestrial radiation (MJ/m²/day)
+        rs (array-like): Solar radiation (MJ/m²/day)
+        t_mean (array-like): Mean air temperature (°C)
+        rh_mean (array-like): Mean relative humidity (%)
+        u (array-like or None): Wind speed at 2m height (m/s); None selects Eq. 33
+        albedo (array-like): Surface albedo
+        elevation (array-like): Elevation above sea level in meters
+        a_u (float): Wind function coefficient a_u (Eq. 32 only)
+        b_u (float): Wind function coefficient b_u (Eq. 32 only)
+        backend (str): Kernel to use ('auto', 'numpy' or 'numba')
+
+    Returns:
+        numpy.ndarray: Potential evaporation (mm/day), clamped at zero
+    """
+    if backend not in ('auto', 'numpy', 'numba'):
+        raise ValueError("Invalid backend specified")
+
+    inputs = [ra, rs, t_mean, rh_mean, albedo, elevation] + ([u] if u is not None else [])
+    shape = np.broadcast_shapes(*(np.shape(x) for x in inputs))
+    if numba is not None and len(shape) <= 3 and (
+            backend == 'numba' or (backend == 'auto' and math.prod(shape) >= NUMBA_MIN_SIZE)):
+        return _penman_evaporation_numba(shape, ra, rs, t_mean, rh_mean, u, albedo, elevation, a_u, b_u)
+
+    rs = np.asarray(rs, dtype=float)
+    t_mean = np.asarray(t_mean, dtype=float)
+    rh_mean = np.asarray(rh_mean, dtype=float)
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        if u is not None:
+            # Simplified Penman equation with wind data (Eq. 32)
+            u = np.asarray(u, dtype=float)
+            term1 = 0.051 * (1 - np.asarray(albedo)) * rs * np.sqrt(t_mean + 9.5)
+            term2 = 2.4 * (rs / ra) ** 2
+            term3 = 0.052 * (t_mean + 20) * (1 - rh_mean / 100) * (a_u - 0.38 + b_u * u)
+        else:
+            # Simplified Penman equation without wind data (Eq. 33)
+            term1 = 0.047 * rs * np.sqrt(t_mean + 9.5)
+            term2 = 2.4 * (rs / ra) ** 2
+            term3 = 0.09 * (t_mean + 20) * (1 - rh_mean / 100)
+
+        # Elevation correction (Eq. 36)
+        elevation_correction = 0.00012 * np.asarray(elevation)
+        e_pen = term1 - term2 + term3 + elevation_correction
+
+    return np.maximum(e_pen, 0)  # Evaporation can't be negative
+
+
+def _penman_evaporation_variants(ra, rs, t_mean, rh_mean, u, albedo, elevation, a_u, b_u, include_no_wind=True,
+                                 clamp=True):
+    """
+    Evaluate Eq. 32 for several wind functions and optionally Eq. 33 in one pass.
+
+    The terms that do not depend on the wind function (sqrt(T + 9.5), the radiation ratio,
+    the humidity factor and the elevation correction) are computed once, and every variant
+    is written in place into one output array; the variants form its last axis.
+
+    Args:
+        ra, rs, t_mean, rh_mean, albedo, elevation: As in _penman_evaporation
+        u (array-like or None): Wind speed at 2m height (m/s)
+        a_u (numpy.ndarray): Coefficient a_u of each wind function, shaped (k,)
+        b_u (numpy.ndarray): Coefficient b_u of each wind function, shaped (k,)
+        include_no_wind (bool): Append Eq. 33 as the last variant
+        clamp (bool): Clamp negative values at zero
+
+    Returns:
+        numpy.ndarray: Potential evaporation (mm/day), shaped broadcast shape + (variants,)
+    """
+    rs = np.asarray(rs, dtype=float)
+    t_mean = np.asarray(t_mean, dtype=float)
+    rh_mean = np.asarray(rh_mean, dtype=float)
+    inputs = [ra, rs, t_mean, rh_mean, albedo, elevation] + ([u] if len(a_u) else [])
+    shape = np.broadcast_shapes(*(np.shape(x) for x in inputs))
+    out = np.empty((len(a_u) + bool(include_no_wind),) + shape)  # variants first, filled in place
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        # Shared by all variants
+        rs_sqrt_t = rs * np.sqrt(t_mean + 9.5)
+        humidity = (t_mean + 20) * (1 - rh_mean / 100)
+        common = 0.00012 * np.asarray(elevation) - 2.4 * (rs / ra) ** 2  # Eq. 36 minus term2
+
+        if len(a_u):
+            # Eq. 32: term3 is linear in (a_u - 0.38 + b_u * u), so only two products per wind function
+            base = common + 0.051 * (1 - np.asarray(albedo)) * rs_sqrt_t
+            humidity_wind = 0.052 * humidity
+            humidity_u = humidity_wind * np.asarray(u, dtype=float)
+            for i, (a, b) in enumerate(zip(a_u, b_u)):
+                np.multiply(humidity_wind, a - 0.38, out=out[i])
+                out[i] += base
+                out[i] += b * humidity_u
+        if include_no_wind:
+            # Eq. 33
+            out[-1] = common + 0.047 * rs_sqrt_t + 0.09 * humidity
+
+    if clamp:
+        np.maximum(out, 0, out=out)  # Evaporation can't be negative
+    return np.moveaxis(out, 0, -1)
+
+
+def _penman_evaporation_fallback(ra, rs, t_mean, rh_mean, u, albedo, elevation, a_u, b_u, backend='auto'):
+    """
+    Evaluate Eq. 32 where the wind speed is finite and Eq. 33 elsewhere.
+
+    Args:
+        ra, rs, t_mean, rh_mean, albedo, elevation, a_u, b_u, backend: As in _penman_evaporation
+        u (array-like): Wind speed at 2m height (m/s), NaN where missing
+
+    Returns:
+        tuple: (potential evaporation in mm/day, boolean array that is True where Eq. 32 was used)
+    """
+    u = np.asarray(u, dtype=float)
+    with_wind = _penman_evaporation(ra, rs, t_mean, rh_mean, u, albedo, elevation, a_u, b_u, backend=backend)
+    without_wind = _penman_evaporation(ra, rs, t_mean, rh_mean, None, albedo, elevation, backend=backend)
+    used_wind = np.broadcast_to(np.isfinite(u), with_wind.shape)
+    return np.where(used_wind, with_wind, without_wind), used_wind.copy()
+
+
+def _penman_evaporation_numba(shape, ra, rs, t_mean, rh_mean, u, albedo, elevation, a_u, b_u):
+    """
+    Evaluate the simplified Penman equation with the compiled Numba kernel.
+
+    Inputs are passed as zero-copy broadcast views padded to three dimensions, in their own
+    float32/float64 dtype, so the kernel allocates nothing but the output array.
+
+    Args:
+        shape (tuple): Broadcast shape of the inputs (at most three dimensions)
+        ra, rs, t_mean, rh_mean, u, albedo, elevation, a_u, b_u: As in _penman_evaporation
+
+    Returns:
+        numpy.ndarray: Potential evaporation (mm/day), clamped at zero
+    """
+    shape_3d = tuple(shape) + (1,) * (3 - len(shape))
 
-        # Calculate extraterrestrial radiation Ra (Eq. 35)
-        if abs(phi) > 23.5 * math.pi / 180:  # Temperate zone
-            Ra = 3 * N * math.sin(0.131 * N - 0.95 * phi)
-        else:  # Tropical zone
-            Ra = 118 * N ** 2 * math.sin(0.131 * N - 0.2 * phi)
+    def as_3d(values):
+        # float32/float64 arrays keep their dtype (the kernel is compiled per dtype); only
+        # scalars, lists and other dtypes are converted
+        values = np.asarray(values)
+        if values.dtype not in (np.float32, np.float64):
+            values = values.astype(np.float64)
+        return np.broadcast_to(values, shape).reshape(shape_3d)
 
-        return Ra, N
+    use_wind = u is not None
+    out = np.empty(shape_3d)
+    _penman_kernel(as_3d(ra), as_3d(rs), as_3d(t_mean), as_3d(rh_mean), as_3d(u if use_wind else 0.0),
+                   as_3d(albedo), as_3d(elevation), use_wind,
+                   float(a_u) if use_wind else 0.0, float(b_u) if use_wind else 0.0, out)
+    return out.reshape(shape)
 
 
+if numba is not None:
+    @numba.njit(parallel=True, cache=True, error_model='numpy')
+    def _penman_kernel(ra, rs, t_mean, rh_mean, u, albedo, elevation, use_wind, a_u, b_u, out):
+        """Fused Eqs. 32/33 + Eq. 36 + clamp over three-dimensional inputs, parallel over the first axis."""
+        for i in numba.prange(out.shape[0]):
+            for j in range(out.shape[1]):
+                for k in range(out.shape[2]):
+                    t = t_mean[i, j, k]
+                    rs_ijk = rs[i, j, k]
+                    ratio = rs_ijk / ra[i, j, k]
+                    if use_wind:
+                        # Simplified Penman equation with wind data (Eq. 32)
+                        term1 = 0.051 * (1 - albedo[i, j, k]) * rs_ijk * math.sqrt(t + 9.5)
+                        term3 = (0.052 * (t + 20) * (1 - rh_mean[i, j, k] / 100)
+                                 * (a_u - 0.38 + b_u * u[i, j, k]))
+                    else:
+                        # Simplified Penman equation without wind data (Eq. 33)
+                        term1 = 0.047 * rs_ijk * math.sqrt(t + 9.5)
+                        term3 = 0.09 * (t + 20) * (1 - rh_mean[i, j, k] / 100)
+                    e_pen = term1 - 2.4 * ratio * ratio + term3 + 0.00012 * elevation[i, j, k]
+                    out[i, j, k] = 0.0 if e_pen < 0 else e_pen  # NaN propagates, as with np.maximum
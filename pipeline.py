@@ -0,0 +1,175 @@
+"""
+----------------------------------------------------------------------
+Project: Penman Evaporation Calculator
+Filename: pipeline
+Author: Roy Elkayam
+Created: 2026-10-17
+Description: Fused raw 10-minute data -> daily evaporation pipeline
+----------------------------------------------------------------------
+"""
+
+import pandas as pd
+from ims_data import (DAILY_AGGREGATIONS, UnsortedDataError, aggregate_daily_arrays, convert_daily_units,
+                      iter_raw_day_blocks, parse_ims_datetime)
+
+# Daily inputs of the Penman kernel
+PENMAN_INPUTS = ['temperature', 'global_radiation', 'relative_humidity', 'wind_speed']
+
+# Columns of a full daily result file
+RESULT_COLUMNS = ('temperature', 'global_radiation', 'precipitation', 'relative_humidity',
+                  'wind_speed', 'sample_count', 'penman_evaporation')
+
+
+def evaporation_from_raw(timestamps, columns, penman, output_columns=('penman_evaporation',),
+                         use_wind=True, wind_function='penman1948', start=None):
+    """
+    Compute daily Penman evaporation directly from raw 10-minute arrays.
+
+    The raw observations are reduced to daily values, converted from W/m² to MJ/m²/day and
+    passed to the vectorized Penman kernel without materializing the daily DataFrame; only
+    the requested columns are assembled into the result.
+
+    Args:
+        timestamps (array-like): Observation timestamps (datetime64 values)
+        columns (dict): Column name -> array of raw observations
+        penman (PenmanEvaporation): Calculator for the station
+        output_columns (sequence): Columns to return: 'penman_evaporation', 'sample_count',
+            any aggregated observation column and, with use_wind='fallback', 'used_wind'
+        use_wind (bool or str): Use the wind equation (Eq. 32) instead of the no-wind one (Eq. 33);
+            'fallback' picks Eq. 32 on days with wind data and Eq. 33 on the others
+        wind_function (str): Wind function to use ('penman1948', 'penman1956', 'linacre1993')
+        start (pandas.Timestamp, optional): First day of the output, if earlier than the data
+
+    Returns:
+        pandas.DataFrame: Requested daily columns indexed by date
+    """
+    needed = _needed_columns(output_columns, use_wind)
+    days, daily, sample_count = aggregate_daily_arrays(
+        timestamps, columns, {name: DAILY_AGGREGATIONS[name] for name in needed}, start=start)
+
+    daily = convert_daily_units(daily)
+    daily['sample_count'] = sample_count
+    if use_wind == 'fallback':
+        daily['penman_evaporation'], daily['used_wind'] = evaporate_daily(days, daily, penman, use_wind,
+                                                                          wind_function)
+    elif 'penman_evaporation' in output_columns:
+        daily['penman_evaporation'] = evaporate_daily(days, daily, penman, use_wind, wind_function)
+
+    index = pd.DatetimeIndex(days, freq='D', name='datetime')
+    return pd.DataFrame({name: daily[name] for name in output_columns}, index=index)
+
+
+def evaporate_daily(days, daily, penman, use_wind=True, wind_function='penman1948'):
+    """
+    Compute daily Penman evaporation from daily values.
+
+    This is the evaporation step shared by the batch, incremental and streaming paths, so
+    they all pick the equation the same way.
+
+    Args:
+        days (array-like): Day starts (datetime64 values)
+        daily (dict): Column name -> daily values in result units (see convert_daily_units)
+        penman (PenmanEvaporation): Calculator for the station
+        use_wind (bool or str): Use the wind equation (Eq. 32) instead of the no-wind one (Eq. 33);
+            'fallback' picks Eq. 32 on days with wind data and Eq. 33 on the others
+        wind_function (str): Wind function to use ('penman1948', 'penman1956', 'linacre1993')
+
+    Returns:
+        numpy.ndarray: Potential evaporation (mm/day); with use_wind='fallback' a tuple
+            (evaporation, boolean mask of the days that used the wind equation)
+    """
+    if use_wind == 'fallback':
+        return penman.calculate_daily_evaporation_fallback(
+            dates=days,
+            t_mean=daily['temperature'],
+            rh_mean=daily['relative_humidity'],
+            rs=daily['global_radiation'],
+            u=daily['wind_speed'],
+            wind_function=wind_function
+        )
+    return penman.calculate_daily_evaporation_batch(
+        dates=days,
+        t_mean=daily['temperature'],
+        rh_mean=daily['relative_humidity'],
+        rs=daily['global_radiation'],
+        u=daily['wind_speed'] if use_wind else None,
+        wind_function=wind_function
+    )
+
+
+def iter_evaporation_chunks(path, penman, output_columns=('penman_evaporation',), use_wind=True,
+                            wind_function='penman1948', chunksize=500_000):
+    """
+    Stream a raw 10-minute IMS CSV and yield daily evaporation chunk by chunk.
+
+    Only the columns needed for the requested output are read from the file, and each
+    block of whole days goes straight from raw arrays to evaporation.
+
+    Args:
+        path (str): Path of the raw CSV file
+        penman (PenmanEvaporation): Calculator for the station
+        output_columns (sequence): Columns to return (see evaporation_from_raw)
+        use_wind (bool or str): Use the wind equation (Eq. 32) instead of the no-wind one (Eq. 33),
+            or 'fallback' to choose per day (see evaporation_from_raw)
+        wind_function (str): Wind function to use ('penman1948', 'penman1956', 'linacre1993')
+        chunksize (int): Number of raw rows read per chunk
+
+    Yields:
+        pandas.DataFrame: Requested daily columns indexed by date
+    """
+    needed = _needed_columns(output_columns, use_wind)
+
+    next_day = None
+    for timestamps, columns in iter_raw_day_blocks(path, chunksize, columns=needed):
+        daily_df = evaporation_from_raw(timestamps, columns, penman, output_columns,
+                                        use_wind=use_wind, wind_function=wind_function, start=next_day)
+        next_day = daily_df.index[-1] + pd.Timedelta(days=1)
+        yield daily_df
+
+
+def run_pipeline(path, penman, output_columns=('penman_evaporation',), use_wind=True,
+                 wind_function='penman1948', chunksize=500_000):
+    """
+    Compute daily evaporation for a whole raw CSV with the fused streaming pipeline.
+
+    Files that are not in chronological order are processed in one piece instead, since
+    their days cannot be finished chunk by chunk.
+
+    Args:
+        path (str): Path of the raw CSV file
+        penman (PenmanEvaporation): Calculator for the station
+        output_columns (sequence): Columns to return (see evaporation_from_raw)
+        use_wind (bool or str): Use the wind equation (Eq. 32) instead of the no-wind one (Eq. 33),
+            or 'fallback' to choose per day (see evaporation_from_raw)
+        wind_function (str): Wind function to use ('penman1948', 'penman1956', 'linacre1993')
+        chunksize (int): Number of raw rows read per chunk
+
+    Returns:
+        pandas.DataFrame: Requested daily columns indexed by date
+    """
+    try:
+        chunks = list(iter_evaporation_chunks(path, penman, output_columns, use_wind=use_wind,
+                                              wind_function=wind_function, chunksize=chunksize))
+    except UnsortedDataError:
+        raw_df = pd.read_csv(path, usecols=['datetime', *_needed_columns(output_columns, use_wind)])
+        columns = {name: raw_df[name].to_numpy(dtype=float) for name in raw_df.columns if name != 'datetime'}
+        chunks = [evaporation_from_raw(parse_ims_datetime(raw_df['datetime']), columns, penman, output_columns,
+                                       use_wind=use_wind, wind_function=wind_function)]
+    if not chunks:
+        return pd.DataFrame(columns=list(output_columns), index=pd.DatetimeIndex([], name='datetime'))
+    return pd.concat(chunks).asfreq('D')
+
+
+def _needed_columns(output_columns, use_wind):
+    """
+    List the raw columns that have to be aggregated for the requested output.
+
+    Args:
+        output_columns (sequence): Requested output columns
+        use_wind (bool or str): Whether the wind equation is used (True, False or 'fallback')
+
+    Returns:
+        list: Raw column names
+    """
+    needed = PENMAN_INPUTS if use_wind else PENMAN_INPUTS[:-1]
+    return needed + [name for name in output_columns if name in DAILY_AGGREGATIONS and name not in needed]
@@ -0,0 +1,108 @@
+"""
+----------------------------------------------------------------------
+Project: Penman Evaporation Calculator
+Filename: plot_decimation
+Author: Roy Elkayam
+Created: 2026-10-17
+Description: Peak-preserving decimation of long time series for plotting
+----------------------------------------------------------------------
+"""
+
+import numpy as np
+
+# Points kept per series by default: a few per pixel column of a 300 dpi figure
+DEFAULT_MAX_POINTS = 4000
+
+
+def decimate(y, max_points=DEFAULT_MAX_POINTS, method='minmax', x=None):
+    """
+    Select the points of a series to draw, so that long series plot quickly.
+
+    Series that already have at most `max_points` points are returned whole.
+
+    Args:
+        y (array-like): Series values (NaN marks gaps)
+        max_points (int): Maximum number of points to keep
+        method (str): 'minmax' (envelope per bin, keeps gaps) or 'lttb' (Largest-Triangle-Three-Buckets)
+        x (array-like, optional): Sample positions for 'lttb' (default: evenly spaced)
+
+    Returns:
+        numpy.ndarray: Sorted integer indices of the points to draw
+    """
+    y = np.asarray(y, dtype=float)
+    if y.size <= max_points:
+        return np.arange(y.size)
+    if method == 'minmax':
+        return min_max_indices(y, max_points // 2)
+    if method == 'lttb':
+        return lttb_indices(y, max_points, x)
+    raise ValueError("Invalid decimation method specified")
+
+
+def min_max_indices(y, n_bins):
+    """
+    Indices of the minimum and maximum of each of `n_bins` equal-count bins.
+
+    With evenly sampled data each bin is one pixel column, so the drawn line covers exactly
+    the same vertical extent as the full series: every peak and trough is kept. A bin that
+    contains missing values also keeps one NaN point, so gaps still break the line.
+
+    Args:
+        y (numpy.ndarray): Series values
+        n_bins (int): Number of bins
+
+    Returns:
+        numpy.ndarray: Sorted integer indices (at most 3 per bin)
+    """
+    bin_size = -(-y.size // n_bins)
+    n_bins = -(-y.size // bin_size)
+    padded = np.full(n_bins * bin_size, np.nan)
+    padded[:y.size] = y
+    bins = padded.reshape(n_bins, bin_size)
+
+    missing = np.isnan(bins)
+    offsets = bin_size * np.arange(n_bins)
+    lows = np.argmin(np.where(missing, np.inf, bins), axis=1) + offsets
+    highs = np.argmax(np.where(missing, -np.inf, bins), axis=1) + offsets
+    gaps = (np.argmax(missing, axis=1) + offsets)[missing.any(axis=1)]
+    indices = np.unique(np.concatenate([lows, highs, gaps]))
+    return indices[indices < y.size]
+
+
+def lttb_indices(y, n_out, x=None):
+    """
+    Largest-Triangle-Three-Buckets downsampling (Steinarsson, 2013).
+
+    Keeps the first and last point and, from each bucket in between, the point forming the
+    largest triangle with the previously kept point and the mean of the next bucket. This
+    keeps the visual shape with exactly `n_out` points. Missing values are skipped, so gaps
+    are bridged.
+
+    Args:
+        y (numpy.ndarray): Series values
+        n_out (int): Number of points to keep (at least 3)
+        x (array-like, optional): Sample positions (default: evenly spaced)
+
+    Returns:
+        numpy.ndarray: Sorted integer indices
+    """
+    valid = np.flatnonzero(~np.isnan(y))
+    if valid.size <= n_out:
+        return valid
+    x = valid.astype(float) if x is None else np.asarray(x, dtype=float)[valid]
+    y = y[valid]
+
+    edges = np.linspace(1, y.size - 1, n_out - 1).astype(int)
+    selected = np.empty(n_out, dtype=np.int64)
+    selected[0], selected[-1] = 0, y.size - 1
+    previous = 0
+    for i in range(n_out - 2):
+        lo, hi = edges[i], edges[i + 1]
+        next_hi = edges[i + 2] if i + 2 < n_out - 1 else y.size
+        next_x, next_y = x[hi:next_hi].mean(), y[hi:next_hi].mean()
+        # Twice the triangle area (previous point, candidate, next bucket mean)
+        area = np.abs((x[previous] - next_x) * (y[lo:hi] - y[previous])
+                      - (x[previous] - x[lo:hi]) * (next_y - y[previous]))
+        previous = lo + int(np.argmax(area))
+        selected[i + 1] = previous
+    return valid[selected]
@@ -0,0 +1,203 @@
+"""
+----------------------------------------------------------------------
+Project: Penman Evaporation Calculator
+Filename: plot_report
+Author: Roy Elkayam
+Created: 2026-10-17
+Description: Evaporation result figures and headless parallel rendering for many stations
+----------------------------------------------------------------------
+"""
+
+import argparse
+import glob
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import pandas as pd
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+from plot_decimation import DEFAULT_MAX_POINTS, decimate
+
+FIGURE_SIZE = (12, 10)
+
+
+def draw_evaporation_results(fig, df, max_points=DEFAULT_MAX_POINTS, decimation='minmax'):
+    """
+    Draw the weather, wind/radiation and evaporation panels of daily results onto a figure.
+
+    Series longer than `max_points` are decimated before plotting (see plot_decimation.py),
+    which keeps peaks and gaps while drawing only a few thousand points per line.
+
+    Args:
+        fig (matplotlib.figure.Figure): Empty figure to draw on
+        df (pandas.DataFrame): Daily results indexed by date
+        max_points (int): Maximum number of points drawn per series (None draws every point)
+        decimation (str): Decimation method ('minmax' or 'lttb')
+    """
+    def series(column):
+        # Index and values of the points to draw
+        values = df[column].to_numpy(dtype=float)
+        keep = decimate(values, max_points, decimation) if max_points else slice(None)
+        return df.index[keep], values[keep]
+
+    ax1, ax2, ax3 = fig.subplots(3, 1)
+
+    # Plot 1: Temperature and Humidity
+    ax1_twin = ax1.twinx()
+    line1 = ax1.plot(*series('temperature'), 'r-', label='Temperature (°C)', linewidth=1)
+    line2 = ax1_twin.plot(*series('relative_humidity'), 'b-', label='Relative Humidity (%)', linewidth=1)
+
+    ax1.set_ylabel('Temperature (°C)', color='r')
+    ax1_twin.set_ylabel('Relative Humidity (%)', color='b')
+    ax1.set_title('Weather Conditions')
+    ax1.grid(True, alpha=0.3)
+
+    # Combine legends
+    lines = line1 + line2
+    labels = [l.get_label() for l in lines]
+    ax1.legend(lines, labels, loc='upper left')
+
+    # Plot 2: Wind Speed and Global Radiation
+    ax2_twin = ax2.twinx()
+    line3 = ax2.plot(*series('wind_speed'), 'g-', label='Wind Speed (m/s)', linewidth=1)
+    line4 = ax2_twin.plot(*series('global_radiation'), 'orange', label='Global Radiation (W/m²)', linewidth=1)
+
+    ax2.set_ylabel('Wind Speed (m/s)', color='g')
+    ax2_twin.set_ylabel('Global Radiation (W/m²)', color='orange')
+    ax2.set_title('Wind and Radiation')
+    ax2.grid(True, alpha=0.3)
+
+    lines = line3 + line4
+    labels = [l.get_label() for l in lines]
+    ax2.legend(lines, labels, loc='upper left')
+
+    # Plot 3: Evaporation
+    ax3.plot(*series('penman_evaporation'), 'purple', label='Evaporation (mm/d)', linewidth=2)
+    ax3.set_ylabel('Evaporation (mm/d)')
+    ax3.set_xlabel('Time')
+    ax3.set_title('Penman Potential Evaporation')
+    ax3.grid(True, alpha=0.3)
+    ax3.legend()
+
+    # Add precipitation if available
+    if 'precipitation' in df.columns:
+        # One step-filled polygon instead of a bar artist per day
+        ax3_twin = ax3.twinx()
+        ax3_twin.fill_between(*series('precipitation'), step='post', alpha=0.3, color='blue',
+                              label='Precipitation (mm)', linewidth=0)
+        ax3_twin.set_ylabel('Precipitation (mm)', color='blue')
+        ax3_twin.invert_yaxis()  # Invert precipitation axis
+        ax3_twin.legend(loc='upper right')
+
+    fig.tight_layout()
+
+
+def render_evaporation_figure(df, path, title=None, dpi=150, max_points=DEFAULT_MAX_POINTS, decimation='minmax'):
+    """
+    Render daily results to an image file with the Agg backend, without pyplot.
+
+    The figure is never registered with pyplot, so nothing is shown, no display is needed and
+    the figure is freed as soon as it is written, however many figures a process renders.
+
+    Args:
+        df (pandas.DataFrame): Daily results indexed by date
+        path (str): Output image path (format from the extension, e.g. .png, .svg, .pdf)
+        title (str, optional): Figure title (e.g. the station name)
+        dpi (int): Output resolution
+        max_points (int): Maximum number of points drawn per series
+        decimation (str): Decimation method ('minmax' or 'lttb')
+    """
+    fig = Figure(figsize=FIGURE_SIZE)
+    FigureCanvasAgg(fig)
+    try:
+        if title:
+            fig.suptitle(title)
+        draw_evaporation_results(fig, df, max_points, decimation)
+        fig.savefig(path, dpi=dpi, bbox_inches='tight')
+    finally:
+        fig.clear()
+
+
+def render_batch(inputs, output_dir, by_year=False, max_workers=None, image_format='png', dpi=150):
+    """
+    Render result figures for many stations (and optionally each year) on a process pool.
+
+    Inputs are daily result CSVs as written by batch_runner ('<station>_evaporation.csv').
+    One figure is rendered per file, or per file and calendar year with `by_year`; each
+    figure is a separate task, so years of one long station are spread across workers too.
+    A failing figure is recorded in the summary and does not stop the others.
+
+    Args:
+        inputs (str or list): Glob pattern or list of result CSV paths
+        output_dir (str): Directory for the images
+        by_year (bool): Render one figure per calendar year instead of one per file
+        max_workers (int, optional): Number of worker processes (default: CPU count)
+        image_format (str): Image file extension ('png', 'svg', 'pdf', ...)
+        dpi (int): Output resolution
+
+    Returns:
+        pandas.DataFrame: Summary with one row per figure (status, seconds, error)
+    """
+    paths = sorted(glob.glob(inputs)) if isinstance(inputs, str) else list(inputs)
+    os.makedirs(output_dir, exist_ok=True)
+
+    tasks = []
+    for path in paths:
+        name = os.path.splitext(os.path.basename(path))[0]
+        if by_year:
+            years = pd.read_csv(path, usecols=[0], index_col=0, parse_dates=True).index.year.unique()
+            tasks += [(path, f'{name} {year}', os.path.join(output_dir, f'{name}_{year}.{image_format}'), year)
+                      for year in years]
+        else:
+            tasks.append((path, name, os.path.join(output_dir, f'{name}.{image_format}'), None))
+
+    rows = []
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        futures = {executor.submit(_render_file, path, title, output_path, year, dpi): (path, title, output_path)
+                   for path, title, output_path, year in tasks}
+        for future in as_completed(futures):
+            path, title, output_path = futures[future]
+            row = {'figure': title, 'path': path, 'output_path': output_path}
+            try:
+                rows.append({**row, 'status': 'ok', 'seconds': future.result()})
+            except Exception as exc:
+                rows.append({**row, 'status': 'failed', 'error': repr(exc)})
+
+    summary = pd.DataFrame(rows, columns=['figure', 'path', 'status', 'seconds', 'output_path', 'error'])
+    return summary.sort_values('figure', ignore_index=True)
+
+
+def _render_file(path, title, output_path, year, dpi):
+    """
+    Worker: render one result file (or one year of it).
+
+    Returns:
+        float: Seconds spent
+    """
+    start = time.perf_counter()
+    df = pd.read_csv(path, index_col=0, parse_dates=True)
+    if year is not None:
+        df = df[df.index.year == year]
+    render_evaporation_figure(df, output_path, title=title, dpi=dpi)
+    return time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Render evaporation figures for many result files')
+    parser.add_argument('inputs', nargs='+', help='Daily result CSV files or glob patterns')
+    parser.add_argument('--output-dir', default='figures', help='Directory for the images')
+    parser.add_argument('--by-year', action='store_true', help='One figure per station and year')
+    parser.add_argument('--format', default='png', help='Image format (png, svg, pdf, ...)')
+    parser.add_argument('--dpi', type=int, default=150, help='Output resolution')
+    parser.add_argument('--workers', type=int, default=None, help='Number of worker processes')
+    args = parser.parse_args()
+
+    input_paths = sorted({path for pattern in args.inputs for path in glob.glob(pattern)})
+    wall_start = time.perf_counter()
+    render_summary = render_batch(input_paths, args.output_dir, by_year=args.by_year, max_workers=args.workers,
+                                  image_format=args.format, dpi=args.dpi)
+    print(render_summary.drop(columns=['path', 'output_path']).to_string(index=False))
+    n_ok = int((render_summary['status'] == 'ok').sum())
+    print(f"\nFigures: {len(render_summary)} ({n_ok} ok, {len(render_summary) - n_ok} failed)")
+    print(f"Wall time: {time.perf_counter() - wall_start:.2f} s")
@@ -0,0 +1,212 @@
+"""
+----------------------------------------------------------------------
+Project: Penman Evaporation Calculator
+Filename: raw_store
+Author: Roy Elkayam
+Created: 2026-10-17
+Description: Memory-mapped fixed-width binary store for raw 10-minute observations
+----------------------------------------------------------------------
+"""
+
+import json
+import os
+import struct
+
+import numpy as np
+import pandas as pd
+from ims_data import DAILY_AGGREGATIONS, NAT_NS, parse_ims_datetime
+
+# File layout: MAGIC, uint32 format version, uint32 header length, JSON header (padded to
+# HEADER_ALIGN bytes), then fixed-width records of int64 epoch-ns timestamp + float32 columns.
+MAGIC = b'PENRAW\x00\x01'
+FORMAT_VERSION = 1
+HEADER_ALIGN = 64
+_PREAMBLE = struct.Struct('<8sII')
+
+
+def record_dtype(columns):
+    """
+    Record layout of the store: int64 epoch nanoseconds followed by one float32 per column.
+
+    Args:
+        columns (list): Observation column names
+
+    Returns:
+        numpy.dtype: Packed little-endian structured dtype
+    """
+    return np.dtype([('datetime', '<i8')] + [(name, '<f4') for name in columns])
+
+
+def create_raw_store(path, columns=None):
+    """
+    Create an empty store file with its header.
+
+    Args:
+        path (str): Store path
+        columns (list, optional): Observation columns (default: DAILY_AGGREGATIONS columns)
+    """
+    columns = list(DAILY_AGGREGATIONS) if columns is None else list(columns)
+    header = json.dumps({'columns': columns, 'timestamp_unit': 'ns', 'value_dtype': 'float32'}).encode()
+    header_length = -(-(_PREAMBLE.size + len(header)) // HEADER_ALIGN) * HEADER_ALIGN
+    with open(path, 'wb') as f:
+        f.write(_PREAMBLE.pack(MAGIC, FORMAT_VERSION, header_length))
+        f.write(header.ljust(header_length - _PREAMBLE.size, b' '))
+
+
+def append_raw_store(path, df):
+    """
+    Append raw observations (IMS layout) to a store, keeping it sorted by time.
+
+    Rows are sorted before writing; they must not start before the last stored timestamp.
+    Rows without a timestamp (empty or unparseable, i.e. NaT) are dropped, so the stored
+    timestamps stay sorted for RawStore.slice.
+
+    Args:
+        path (str): Store path
+        df (pandas.DataFrame): Raw observations with a 'datetime' column (IMS strings or datetime64)
+
+    Returns:
+        int: Number of rows appended
+    """
+    store = RawStore(path)
+    columns = store.columns
+    last_timestamp = store.last_timestamp()
+    del store  # release the map before the file grows
+
+    timestamps = parse_ims_datetime(df['datetime'])
+    order = np.flatnonzero(~np.isnat(timestamps))
+    order = order[np.argsort(timestamps[order], kind='stable')]
+    records = np.empty(len(order), dtype=record_dtype(columns))
+    records['datetime'] = timestamps[order].view(np.int64)
+    for name in records.dtype.names[1:]:
+        records[name] = df[name].to_numpy(dtype=float)[order]
+
+    if last_timestamp is not None and len(records) and records['datetime'][0] < last_timestamp:
+        raise ValueError("Appended rows start before the last stored timestamp")
+    with open(path, 'ab') as f:
+        f.write(records.tobytes())
+    return len(records)
+
+
+def convert_csv_to_store(csv_path, store_path, chunksize=500_000):
+    """
+    Convert a raw IMS CSV (in chronological order) to a store, chunk by chunk.
+
+    Args:
+        csv_path (str): Raw IMS CSV path
+        store_path (str): Store path (overwritten)
+        chunksize (int): Number of CSV rows read per chunk
+
+    Returns:
+        int: Number of rows written
+    """
+    create_raw_store(store_path)
+    chunks = pd.read_csv(csv_path, chunksize=chunksize, usecols=['datetime', *DAILY_AGGREGATIONS])
+    return sum(append_raw_store(store_path, chunk) for chunk in chunks)
+
+
+class RawStore:
+    """
+    Read-only memory-mapped view of a raw store. Slices are zero-copy views of the file.
+    """
+
+    def __init__(self, path):
+        """
+        Open a store.
+
+        Args:
+            path (str): Store path
+        """
+        self.path = path
+        header_length, header = _read_header(path)
+        self.columns = header['columns']
+        dtype = record_dtype(self.columns)
+        n_rows = (os.path.getsize(path) - header_length) // dtype.itemsize
+        if n_rows:
+            self.records = np.memmap(path, dtype=dtype, mode='r', offset=header_length, shape=(n_rows,))
+        else:
+            self.records = np.empty(0, dtype=dtype)
+
+    def __len__(self):
+        return len(self.records)
+
+    def last_timestamp(self):
+        """
+        Return the last stored timestamp, skipping NaT records written by older versions.
+
+        Returns:
+            int: Epoch nanoseconds, or None if the store holds no timestamped record
+        """
+        timestamps = self.records['datetime']
+        for i in range(len(timestamps) - 1, -1, -1):
+            if timestamps[i] != NAT_NS:
+                return int(timestamps[i])
+        return None
+
+    @property
+    def timestamps(self):
+        """numpy.ndarray: datetime64[ns] view of the timestamp field."""
+        return self.records['datetime'].view('datetime64[ns]')
+
+    def slice(self, start=None, end=None):
+        """
+        Select the records with start <= timestamp < end by binary search.
+
+        Args:
+            start (str or datetime-like, optional): First timestamp to include
+            end (str or datetime-like, optional): First timestamp to exclude
+
+        Returns:
+            numpy.ndarray: Zero-copy structured view of the selected records
+        """
+        timestamps = self.records['datetime']
+        lo = 0 if start is None else np.searchsorted(timestamps, pd.Timestamp(start).value)
+        hi = len(timestamps) if end is None else np.searchsorted(timestamps, pd.Timestamp(end).value)
+        return self.records[lo:hi]
+
+    def arrays(self, start=None, end=None):
+        """
+        Return the selected range as arrays, ready for aggregate_daily_arrays / evaporation_from_raw.
+
+        Args:
+            start (str or datetime-like, optional): First timestamp to include
+            end (str or datetime-like, optional): First timestamp to exclude
+
+        Returns:
+            tuple: (datetime64[ns] timestamps, dict of column name -> float32 array), all zero-copy views
+        """
+        records = self.slice(start, end)
+        return (records['datetime'].view('datetime64[ns]'),
+                {name: records[name] for name in self.columns})
+
+    def to_frame(self, start=None, end=None):
+        """
+        Return the selected range as a raw DataFrame (IMS layout with a typed 'datetime' column),
+        which data_preparation accepts directly.
+
+        Args:
+            start (str or datetime-like, optional): First timestamp to include
+            end (str or datetime-like, optional): First timestamp to exclude
+
+        Returns:
+            pandas.DataFrame: Raw observations
+        """
+        timestamps, columns = self.arrays(start, end)
+        return pd.DataFrame({'datetime': timestamps, **columns})
+
+
+def _read_header(path):
+    """
+    Read and validate the store header.
+
+    Returns:
+        tuple: (header length in bytes, header dict)
+    """
+    with open(path, 'rb') as f:
+        magic, version, header_length = _PREAMBLE.unpack(f.read(_PREAMBLE.size))
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a raw observation store")
+        if version != FORMAT_VERSION:
+            raise ValueError(f"Unsupported raw store version {version}")
+        header = json.loads(f.read(header_length - _PREAMBLE.size).decode())
+    return header_length, header
@@ -0,0 +1,535 @@
+"""
+----------------------------------------------------------------------
+Project: Penman Evaporation Calculator
+Filename: streaming
+Author: Roy Elkayam
+Created: 2026-10-17
+Description: Real-time daily evaporation from live 10-minute observation feeds
+----------------------------------------------------------------------
+"""
+
+import abc
+import argparse
+import math
+import os
+import socket
+import time
+
+import numpy as np
+from ims_data import (DAILY_AGGREGATIONS, NAT_NS, NS_PER_DAY, convert_daily_units, daily_sums_and_counts,
+                      finalize_daily, parse_ims_datetime)
+from penman_calculation import PenmanEvaporation
+from pipeline import evaporate_daily
+
+
+class DailyAccumulator:
+    """
+    Running per-day sums and valid counts of one station, in constant memory.
+
+    Only the open (current) day is kept; when a record of a later day arrives, the open day
+    is closed and returned. Records must arrive in chronological order: a record not later
+    than the last accepted one (late or duplicate), or without a timestamp (NaT), is
+    dropped and counted in `n_dropped`.
+    """
+
+    def __init__(self, names=None):
+        """
+        Args:
+            names (list, optional): Columns to accumulate (default: DAILY_AGGREGATIONS columns)
+        """
+        self.names = list(DAILY_AGGREGATIONS) if names is None else list(names)
+        self.day = None             # open day, in days since the epoch
+        self.last_timestamp = None  # epoch nanoseconds of the last accepted record
+        self.n_dropped = 0
+        self._reset()
+
+    def _reset(self):
+        """Clear the running sums of the open day."""
+        self.sums = dict.fromkeys(self.names, 0.0)
+        self.counts = dict.fromkeys(self.names, 0)
+        self.sample_count = 0
+
+    def add(self, timestamp, values):
+        """
+        Add one record.
+
+        Args:
+            timestamp (int or datetime64): Observation time (epoch nanoseconds or datetime64)
+            values (dict): Column name -> observed value (missing or NaN values are skipped)
+
+        Returns:
+            tuple: Closed days as (days since epoch, sums, counts, sample counts) arrays; empty
+                unless the record starts a new day
+        """
+        if isinstance(timestamp, np.datetime64):
+            timestamp = NAT_NS if np.isnat(timestamp) else int(np.datetime64(timestamp, 'ns').view(np.int64))
+        else:
+            timestamp = int(timestamp)
+        if timestamp == NAT_NS or (self.last_timestamp is not None and timestamp <= self.last_timestamp):
+            self.n_dropped += 1
+            return self._closed([])
+
+        day = timestamp // NS_PER_DAY
+        closed = self._closed([self._close()] if self.day is not None and day != self.day else [])
+        self.day, self.last_timestamp = day, timestamp
+        for name in self.names:
+            value = values.get(name, math.nan)
+            if value == value:  # not NaN
+                self.sums[name] += value
+                self.counts[name] += 1
+        self.sample_count += 1
+        return closed
+
+    def add_batch(self, timestamps, columns):
+        """
+        Add a micro-batch of records with one vectorized pass.
+
+        Args:
+            timestamps (array-like): Observation times (datetime64 values)
+            columns (dict): Column name -> array of observations
+
+        Returns:
+            tuple: Closed days as (days since epoch, sums, counts, sample counts) arrays
+        """
+        timestamps = np.asarray(timestamps, dtype='datetime64[ns]').view(np.int64)
+        order = np.argsort(timestamps, kind='stable')
+        timestamps = timestamps[order]
+        keep = np.ones(timestamps.size, dtype=bool)
+        keep[1:] = timestamps[1:] > timestamps[:-1]
+        keep &= timestamps != NAT_NS
+        if self.last_timestamp is not None:
+            keep &= timestamps > self.last_timestamp
+        self.n_dropped += int(timestamps.size - keep.sum())
+        if not keep.any():
+            return self._closed([])
+
+        timestamps = timestamps[keep]
+        columns = {name: np.asarray(columns[name], dtype=float)[order][keep] for name in self.names}
+        start = None if self.day is None else np.datetime64(self.day * NS_PER_DAY, 'ns')
+        days, sums, counts, sample_count = daily_sums_and_counts(timestamps.view('datetime64[ns]'), columns,
+                                                                 self.names, start=start)
+        days = days.view(np.int64) // NS_PER_DAY
+
+        # Slot 0 continues the open day; the last slot becomes the new open day
+        if self.day is not None:
+            counts = {name: values.copy() for name, values in counts.items()}  # may alias sample_count
+            sample_count = sample_count.copy()
+            for name in self.names:
+                sums[name][0] += self.sums[name]
+                counts[name][0] += self.counts[name]
+            sample_count[0] += self.sample_count
+
+        has_data = sample_count[:-1] > 0  # gap days without any record are not reported
+        closed = (days[:-1][has_data], {name: sums[name][:-1][has_data] for name in self.names},
+                  {name: counts[name][:-1][has_data] for name in self.names}, sample_count[:-1][has_data])
+
+        self.day, self.last_timestamp = int(days[-1]), int(timestamps[-1])
+        self.sums = {name: float(sums[name][-1]) for name in self.names}
+        self.counts = {name: int(counts[name][-1]) for name in self.names}
+        self.sample_count = int(sample_count[-1])
+        return closed
+
+    def open_day(self):
+        """
+        Return the open day so far, without closing it.
+
+        Returns:
+            tuple: The open day as (days since epoch, sums, counts, sample counts) arrays
+                (empty if no record has been added)
+        """
+        return self._closed([] if self.day is None else [(self.day, self.sums, self.counts, self.sample_count)])
+
+    def close(self):
+        """
+        Close the open day (e.g. at the end of a feed).
+
+        Returns:
+            tuple: The closed day as (days since epoch, sums, counts, sample counts) arrays
+        """
+        closed = self._closed([] if self.day is None else [self._close()])
+        self.day = None
+        return closed
+
+    def _close(self):
+        """Snapshot the open day and clear its sums."""
+        snapshot = (self.day, self.sums, self.counts, self.sample_count)
+        self._reset()
+        return snapshot
+
+    def _closed(self, snapshots):
+        """Stack (day, sums, counts, sample_count) snapshots into arrays."""
+        return (np.array([s[0] for s in snapshots], dtype=np.int64),
+                {name: np.array([s[1][name] for s in snapshots], dtype=float) for name in self.names},
+                {name: np.array([s[2][name] for s in snapshots], dtype=np.int64) for name in self.names},
+                np.array([s[3] for s in snapshots], dtype=np.int64))
+
+
+class DailyResult:
+    """
+    Daily evaporation of one station, either final (the day has closed) or provisional.
+    """
+
+    def __init__(self, station, date, values, sample_count, evaporation, provisional=False):
+        self.station = station
+        self.date = date
+        self.values = values
+        self.sample_count = sample_count
+        self.evaporation = evaporation
+        self.provisional = provisional
+
+    def to_dict(self):
+        """Return the result as a flat dict (one row of the results table)."""
+        return {'station': self.station, 'date': str(self.date), **self.values,
+                'sample_count': self.sample_count, 'penman_evaporation': self.evaporation,
+                'provisional': self.provisional}
+
+    def __repr__(self):
+        kind = 'provisional' if self.provisional else 'final'
+        return f"DailyResult({self.station!r}, {self.date}, {self.evaporation:.3f} mm, {kind})"
+
+
+class StreamingEvaporationEngine:
+    """
+    Daily Penman evaporation for many stations from records arriving one at a time or in
+    micro-batches.
+
+    Each station keeps one DailyAccumulator, so memory does not grow with the length of the
+    feed. When a station's day closes, its daily means/sums are finalized exactly as in
+    data_preparation and evaporated with PenmanEvaporation; `provisional` gives the same
+    estimate for the day so far. Records of stations that were not registered are dropped
+    and counted in `n_rejected`, so one bad record does not stop a feed.
+
+    Replaying an archive gives the rows of run_pipeline that have samples, with two
+    differences: a repeated timestamp is counted once (the later copies are dropped, see
+    DailyAccumulator), and days without any record are not reported, whereas run_pipeline
+    returns them with a sample count of 0.
+    """
+
+    def __init__(self, stations, use_wind=True, wind_function='penman1948', on_day_closed=None):
+        """
+        Args:
+            stations (dict): Station name -> PenmanEvaporation
+            use_wind (bool): Use the wind equation (Eq. 32) instead of the no-wind one (Eq. 33)
+            wind_function (str): Wind function to use ('penman1948', 'penman1956', 'linacre1993')
+            on_day_closed (callable, optional): Called with each final DailyResult
+        """
+        self.stations = dict(stations)
+        self.use_wind = use_wind
+        self.wind_function = wind_function
+        self.on_day_closed = on_day_closed
+        self.accumulators = {name: DailyAccumulator() for name in self.stations}
+        self.n_rejected = 0
+
+    def push(self, station, timestamp, values):
+        """
+        Add one 10-minute record of a station.
+
+        Args:
+            station (str): Station name
+            timestamp (int or datetime64): Observation time (epoch nanoseconds or datetime64)
+            values (dict): Column name -> observed value (radiation in W/m²)
+
+        Returns:
+            list: Final DailyResult of each day closed by the record
+        """
+        if station not in self.accumulators:
+            self.n_rejected += 1
+            return []
+        return self._results(station, self.accumulators[station].add(timestamp, values))
+
+    def push_batch(self, station, timestamps, columns):
+        """
+        Add a micro-batch of records of a station.
+
+        Args:
+            station (str): Station name
+            timestamps (array-like): Observation times (datetime64 values)
+            columns (dict): Column name -> array of observations (radiation in W/m²)
+
+        Returns:
+            list: Final DailyResult of each day closed by the batch
+        """
+        if station not in self.accumulators:
+            self.n_rejected += len(timestamps)
+            return []
+        return self._results(station, self.accumulators[station].add_batch(timestamps, columns))
+
+    def provisional(self, station):
+        """
+        Estimate the evaporation of a station's open day from the records received so far.
+
+        The estimate uses the day-so-far means, so early in the day it reflects only the hours
+        already observed (e.g. the night-time radiation before sunrise).
+
+        Args:
+            station (str): Station name
+
+        Returns:
+            DailyResult: Provisional result, or None if the station has no open day
+        """
+        results = self._results(station, self.accumulators[station].open_day(), provisional=True)
+        return results[0] if results else None
+
+    def flush(self):
+        """
+        Close the open day of every station (e.g. at the end of a replayed feed).
+
+        Returns:
+            list: Final DailyResult of each closed day
+        """
+        return [result for station, accumulator in self.accumulators.items()
+                for result in self._results(station, accumulator.close())]
+
+    def consume(self, adapter, flush=False):
+        """
+        Feed the engine from an input adapter and yield results as days close.
+
+        Args:
+            adapter (InputAdapter): Source of (station, timestamps, columns) micro-batches
+            flush (bool): Close the open days when the adapter is exhausted
+
+        Yields:
+            DailyResult: Final result of each closed day
+        """
+        for station, timestamps, columns in adapter:
+            yield from self.push_batch(station, timestamps, columns)
+        if flush:
+            yield from self.flush()
+
+    def _results(self, station, closed, provisional=False):
+        """Finalize closed (days, sums, counts, sample counts) arrays into DailyResults."""
+        days, sums, counts, sample_count = closed
+        if not days.size:
+            return []
+
+        daily = convert_daily_units(finalize_daily(sums, counts))
+        dates = (days * NS_PER_DAY).view('datetime64[ns]')
+        evaporation = evaporate_daily(dates, daily, self.stations[station], self.use_wind, self.wind_function)
+
+        results = [DailyResult(station, dates[i].astype('datetime64[D]'),
+                               {name: float(values[i]) for name, values in daily.items()},
+                               int(sample_count[i]), float(evaporation[i]), provisional)
+                   for i in range(days.size)]
+        if self.on_day_closed is not None and not provisional:
+            for result in results:
+                self.on_day_closed(result)
+        return results
+
+
+class InputAdapter(abc.ABC):
+    """
+    Source of raw records for StreamingEvaporationEngine.consume.
+
+    Iterating an adapter yields (station, datetime64[ns] timestamps, dict of column arrays)
+    micro-batches; subclasses implement __iter__ and, if they hold resources, close().
+    Lines that cannot be parsed (too few fields, unparseable values) are dropped and
+    counted in `n_malformed`.
+    """
+
+    columns = ['datetime', *DAILY_AGGREGATIONS]
+
+    def __init__(self):
+        self.n_malformed = 0
+
+    @abc.abstractmethod
+    def __iter__(self):
+        """Yield (station, timestamps, columns) micro-batches."""
+
+    def close(self):
+        """Stop the feed and release its resources."""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _parse_lines(self, lines, columns):
+        """
+        Parse complete CSV lines (IMS layout) into a micro-batch.
+
+        Malformed lines are left out and counted in `n_malformed`.
+
+        Returns:
+            tuple: (datetime64[ns] timestamps, dict of column name -> float array)
+        """
+        position = {name: i for i, name in enumerate(columns)}
+        n_fields = max(position[name] for name in ('datetime', *DAILY_AGGREGATIONS)) + 1
+        stamps, rows = [], []
+        for line in lines:
+            fields = line.rstrip('\r\n').split(',')
+            try:
+                if len(fields) < n_fields:
+                    raise ValueError(f"expected {n_fields} fields, got {len(fields)}")
+                rows.append([_to_float(fields[position[name]]) for name in DAILY_AGGREGATIONS])
+            except ValueError:
+                self.n_malformed += 1
+                continue
+            stamps.append(fields[position['datetime']])
+
+        try:
+            timestamps = parse_ims_datetime(stamps)
+        except ValueError:
+            # Parse one by one so only the unparseable timestamps are lost
+            timestamps = np.array([_parse_timestamp(stamp) for stamp in stamps], dtype='datetime64[ns]')
+        valid = ~np.isnat(timestamps)
+        if not valid.all():
+            self.n_malformed += int((~valid).sum())
+            timestamps = timestamps[valid]
+            rows = [row for row, keep in zip(rows, valid) if keep]
+        values = np.array(rows, dtype=float).reshape(len(rows), len(DAILY_AGGREGATIONS))
+        return timestamps, {name: values[:, i] for i, name in enumerate(DAILY_AGGREGATIONS)}
+
+
+class FileTailAdapter(InputAdapter):
+    """
+    Follow a raw IMS CSV that is being appended to (like `tail -f`).
+
+    The file is read in blocks of at most `block_size` bytes and the complete lines of each
+    block are yielded as one micro-batch, so replaying a long archive needs memory for one
+    block only. A partially written last line is kept until it is complete.
+    """
+
+    def __init__(self, path, station, poll_interval=1.0, idle_timeout=None, block_size=1 << 20, from_end=False):
+        """
+        Args:
+            path (str): Raw IMS CSV path (with its header line)
+            station (str): Station name of the file
+            poll_interval (float): Seconds between polls once the end of the file is reached
+            idle_timeout (float, optional): Stop after this many seconds without new lines
+                (default: follow until close() is called)
+            block_size (int): Maximum number of bytes read per micro-batch
+            from_end (bool): Skip the lines already in the file and follow only new ones
+        """
+        self.path = path
+        self.station = station
+        self.poll_interval = poll_interval
+        self.idle_timeout = idle_timeout
+        self.block_size = block_size
+        self.from_end = from_end
+        self._closed = False
+        super().__init__()
+
+    def __iter__(self):
+        with open(self.path, 'rb') as f:
+            header = None
+            if self.from_end:
+                header = f.readline().decode().strip().split(',')
+                f.seek(self._end_of_last_line(f))
+            pending = b''
+            last_data = time.monotonic()
+            while not self._closed:
+                block = f.read(self.block_size)
+                data = pending + block
+                end = data.rfind(b'\n') + 1
+                pending = data[end:]
+                lines = data[:end].decode().splitlines()
+                if header is None and lines:
+                    header = lines.pop(0).strip().split(',')
+                if block:
+                    last_data = time.monotonic()
+                if lines:
+                    yield (self.station, *self._parse_lines(lines, header))
+                if block:
+                    continue
+                if self.idle_timeout is not None and time.monotonic() - last_data >= self.idle_timeout:
+                    return
+                time.sleep(self.poll_interval)
+
+    def _end_of_last_line(self, f):
+        """Byte offset just after the last complete line (never before the current position)."""
+        start = f.tell()
+        size = f.seek(0, os.SEEK_END)
+        position = max(start, size - self.block_size)
+        f.seek(position)
+        return position + f.read().rfind(b'\n') + 1
+
+    def close(self):
+        self._closed = True
+
+
+class SocketAdapter(InputAdapter):
+    """
+    Receive records over a local TCP socket, one CSV line per record:
+    'station,datetime,temperature,global_radiation,precipitation,relative_humidity,wind_speed'.
+
+    The socket is bound on construction (port 0 picks a free port, see `address`); clients
+    connect one after the other and each connection is read until the client closes it.
+    """
+
+    columns = ['station', 'datetime', *DAILY_AGGREGATIONS]
+
+    def __init__(self, host='127.0.0.1', port=0, max_connections=None):
+        """
+        Args:
+            host (str): Interface to listen on
+            port (int): Port to listen on (0 for any free port)
+            max_connections (int, optional): Stop after serving this many clients
+                (default: serve until close() is called)
+        """
+        self.max_connections = max_connections
+        self._server = socket.create_server((host, port))
+        self._server.settimeout(0.5)  # lets close() stop the accept loop
+        self._closed = False
+        super().__init__()
+
+    @property
+    def address(self):
+        """tuple: (host, port) the adapter listens on."""
+        return self._server.getsockname()[:2]
+
+    def __iter__(self):
+        served = 0
+        while not self._closed and (self.max_connections is None or served < self.max_connections):
+            try:
+                connection, _ = self._server.accept()
+            except socket.timeout:
+                continue
+            except OSError:  # server socket closed
+                return
+            served += 1
+            with connection, connection.makefile('r') as stream:
+                for line in stream:
+                    if not line.strip():
+                        continue
+                    station = line.split(',', 1)[0]
+                    timestamps, values = self._parse_lines([line], self.columns)
+                    if timestamps.size:
+                        yield station, timestamps, values
+
+    def close(self):
+        self._closed = True
+        self._server.close()
+
+
+def _to_float(text):
+    """Parse a CSV field, treating an empty field as missing."""
+    return float(text) if text.strip() else math.nan
+
+
+def _parse_timestamp(text):
+    """Parse one IMS timestamp field, returning NaT if it is empty or unparseable."""
+    try:
+        return parse_ims_datetime([text])[0]
+    except ValueError:
+        return np.datetime64('NaT', 'ns')
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Live daily evaporation from a growing IMS CSV')
+    parser.add_argument('path', help='Raw IMS CSV that is being appended to')
+    parser.add_argument('--latitude', type=float, required=True, help='Station latitude (decimal degrees)')
+    parser.add_argument('--elevation', type=float, default=0, help='Station elevation (m)')
+    parser.add_argument('--albedo', type=float, default=0.08, help='Surface albedo')
+    parser.add_argument('--poll', type=float, default=5.0, help='Seconds between polls of the file')
+    parser.add_argument('--idle-timeout', type=float, default=None, help='Stop after this many idle seconds')
+    parser.add_argument('--from-end', action='store_true', help='Follow only lines written after the start')
+    args = parser.parse_args()
+
+    station_name = os.path.splitext(os.path.basename(args.path))[0]
+    engine = StreamingEvaporationEngine({station_name: PenmanEvaporation(args.latitude, args.elevation,
+                                                                         args.albedo)})
+    with FileTailAdapter(args.path, station_name, args.poll, args.idle_timeout,
+                         from_end=args.from_end) as feed:
+        for day_result in engine.consume(feed):
+            print(day_result)
@@ -0,0 +1,225 @@
+"""
+----------------------------------------------------------------------
+Project: Penman Evaporation Calculator
+Filename: synthetic_data
+Author: Roy Elkayam
+Created: 2026-10-17
+Description: Generates synthetic IMS-style 10-minute weather data for load testing
+----------------------------------------------------------------------
+"""
+
+import argparse
+import math
+import os
+
+import numpy as np
+import pandas as pd
+from ims_data import format_ims_datetime
+
+try:
+    import pyarrow
+    import pyarrow.csv
+except ImportError:  # pyarrow is optional; pandas writes the CSV without it (several times slower)
+    pyarrow = None
+
+SAMPLES_PER_DAY = 144  # 10-minute resolution
+
+
+def generate_station_chunks(start='2000-01-01', n_days=365, latitude_deg=31.96, seed=0, station=0,
+                            chunk_days=365, gap_fraction=0.0, mean_gap_length=36,
+                            duplicate_fraction=0.0, outlier_fraction=0.0, missing_fraction=0.0):
+    """
+    Generate one station's synthetic 10-minute observations as a sequence of DataFrames.
+
+    Values follow seasonal and diurnal cycles: radiation from the solar elevation and a
+    daily cloudiness, temperature peaking in the afternoon, humidity moving against
+    temperature, afternoon wind and winter rain events. Each chunk has its own random
+    stream derived from (seed, station, chunk index), so for a given seed and chunk size
+    the output is reproducible and chunks can be generated independently.
+
+    Args:
+        start (str): First day
+        n_days (int): Number of days to generate
+        latitude_deg (float): Station latitude, used for the solar geometry
+        seed (int): Base random seed
+        station (int): Station number, mixed into the random streams
+        chunk_days (int): Days per generated chunk
+        gap_fraction (float): Fraction of rows removed as gaps (outages)
+        mean_gap_length (int): Mean gap length in rows
+        duplicate_fraction (float): Fraction of rows written twice
+        outlier_fraction (float): Fraction of values replaced by implausible spikes
+        missing_fraction (float): Fraction of values left empty (NaN)
+
+    Yields:
+        pandas.DataFrame: Raw observations in the IMS CSV layout
+    """
+    phi = math.radians(latitude_deg)
+    first_day = np.datetime64(start, 'D')
+
+    for chunk_index, chunk_start in enumerate(range(0, n_days, chunk_days)):
+        rng = np.random.default_rng([seed, station, chunk_index])
+        days = min(chunk_days, n_days - chunk_start)
+        n = days * SAMPLES_PER_DAY
+        timestamps = (first_day + chunk_start).astype('datetime64[m]') + np.arange(n) * np.timedelta64(10, 'm')
+
+        day_of_year = ((timestamps.astype('datetime64[D]') - timestamps.astype('datetime64[Y]'))
+                       .astype(np.int64) + 1)
+        hour = (np.arange(n) % SAMPLES_PER_DAY) / 6
+        season = np.cos(2 * np.pi * (day_of_year - 200) / 365)  # 1 in mid July, -1 in mid January
+
+        # Solar elevation from declination and hour angle
+        declination = 0.409 * np.sin(2 * np.pi * day_of_year / 365 - 1.39)
+        hour_angle = np.pi * (hour - 12) / 12
+        sin_elevation = (np.sin(phi) * np.sin(declination)
+                         + np.cos(phi) * np.cos(declination) * np.cos(hour_angle))
+        daylight = np.clip(sin_elevation, 0, None)
+
+        # Day-to-day weather: cloudiness, temperature anomaly and rain, one draw per day
+        cloudiness = np.repeat(rng.beta(1.2, 4 + 3 * (season[::SAMPLES_PER_DAY] + 1), days), SAMPLES_PER_DAY)
+        anomaly = np.repeat(rng.normal(0, 2, days), SAMPLES_PER_DAY)
+        rainy_day = np.repeat(rng.random(days) < 0.2 * (1 - season[::SAMPLES_PER_DAY]) / 2, SAMPLES_PER_DAY)
+
+        diurnal = np.cos(2 * np.pi * (hour - 15) / 24)  # temperature peaks mid-afternoon
+        temperature = 19 + 7 * season + 5 * diurnal * (1 - cloudiness) + anomaly + rng.normal(0, 0.3, n)
+        global_radiation = 1100 * daylight * (1 - 0.75 * cloudiness) * rng.uniform(0.95, 1.05, n)
+        relative_humidity = np.clip(65 - 8 * season - 18 * diurnal + 20 * cloudiness + rng.normal(0, 3, n),
+                                    5, 100)
+        wind_speed = np.abs(2 + 1.5 * np.clip(np.sin(np.pi * (hour - 9) / 12), 0, None)
+                            + rng.gamma(2, 0.5, n) - 1)
+        precipitation = np.where(rainy_day & (rng.random(n) < 0.15), rng.exponential(0.3, n), 0)
+
+        chunk = pd.DataFrame({
+            'temperature': temperature.round(1),
+            'global_radiation': global_radiation.round(0),
+            'precipitation': precipitation.round(1),
+            'relative_humidity': relative_humidity.round(0),
+            'wind_speed': wind_speed.round(1),
+        })
+        _add_outliers(chunk, rng, outlier_fraction)
+        _add_missing(chunk, rng, missing_fraction)
+
+        keep = _gap_mask(n, rng, gap_fraction, mean_gap_length)
+        chunk.insert(0, 'datetime', format_ims_datetime(timestamps))
+        chunk = chunk[keep]
+        if duplicate_fraction > 0:
+            repeats = 1 + (rng.random(len(chunk)) < duplicate_fraction)
+            chunk = chunk.loc[chunk.index.repeat(repeats)]
+        yield chunk.reset_index(drop=True)
+
+
+def write_station_csv(path, **kwargs):
+    """
+    Write one synthetic station to an IMS-format CSV, chunk by chunk.
+
+    Args:
+        path (str): Output CSV path
+        **kwargs: Passed to generate_station_chunks
+
+    Returns:
+        int: Number of rows written
+    """
+    n_rows = 0
+    with open(path, 'wb') as f:
+        for i, chunk in enumerate(generate_station_chunks(**kwargs)):
+            if i == 0:
+                f.write((','.join(chunk.columns) + '\n').encode())
+            if pyarrow is not None:
+                pyarrow.csv.write_csv(pyarrow.Table.from_pandas(chunk, preserve_index=False), f,
+                                      write_options=pyarrow.csv.WriteOptions(include_header=False,
+                                                                               quoting_style='none'))
+            else:
+                f.write(chunk.to_csv(index=False, header=False).encode())
+            n_rows += len(chunk)
+    return n_rows
+
+
+def generate_dataset(output_dir, n_stations=1, n_years=1, start='2000-01-01', seed=0, **kwargs):
+    """
+    Write a synthetic multi-station dataset: one IMS CSV per station plus a stations.csv.
+
+    The metadata file has the layout expected by batch_runner (station, latitude,
+    elevation, albedo).
+
+    Args:
+        output_dir (str): Output directory
+        n_stations (int): Number of stations
+        n_years (int): Years of 10-minute data per station
+        start (str): First day
+        seed (int): Base random seed
+        **kwargs: Passed to generate_station_chunks (gap, duplicate, outlier fractions ...)
+
+    Returns:
+        pandas.DataFrame: Station metadata, with the number of rows written per station
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    rng = np.random.default_rng([seed, n_stations])
+    stations = pd.DataFrame({
+        'station': [f'station_{i:04d}' for i in range(n_stations)],
+        'latitude': rng.uniform(29.5, 33.3, n_stations).round(3),
+        'elevation': rng.uniform(-400, 1000, n_stations).round(0),
+        'albedo': 0.08,
+    })
+
+    n_days = (pd.Timestamp(start) + pd.DateOffset(years=n_years) - pd.Timestamp(start)).days
+    rows = []
+    for i, station in stations.iterrows():
+        rows.append(write_station_csv(os.path.join(output_dir, f"{station['station']}.csv"),
+                                      start=start, n_days=n_days, latitude_deg=station['latitude'],
+                                      seed=seed, station=i, **kwargs))
+
+    stations.to_csv(os.path.join(output_dir, 'stations.csv'), index=False)
+    return stations.assign(rows=rows)
+
+
+def _gap_mask(n, rng, gap_fraction, mean_gap_length):
+    """Boolean mask of rows to keep, with geometric-length gaps covering about `gap_fraction` of rows."""
+    keep = np.ones(n, dtype=bool)
+    if gap_fraction <= 0:
+        return keep
+    n_gaps = rng.poisson(n * gap_fraction / mean_gap_length)
+    starts = rng.integers(0, n, n_gaps)
+    lengths = rng.geometric(1 / mean_gap_length, n_gaps)
+    for gap_start, length in zip(starts, lengths):
+        keep[gap_start:gap_start + length] = False
+    return keep
+
+
+def _add_outliers(chunk, rng, outlier_fraction):
+    """Replace a fraction of values with sensor spikes (in place)."""
+    if outlier_fraction <= 0:
+        return
+    spikes = {'temperature': (-40, 70), 'global_radiation': (2000, 5000), 'precipitation': (50, 200),
+              'relative_humidity': (-10, 150), 'wind_speed': (40, 99)}
+    for column, (low, high) in spikes.items():
+        rows = np.flatnonzero(rng.random(len(chunk)) < outlier_fraction)
+        chunk.loc[rows, column] = rng.uniform(low, high, len(rows)).round(1)
+
+
+def _add_missing(chunk, rng, missing_fraction):
+    """Blank out a fraction of values (in place)."""
+    if missing_fraction <= 0:
+        return
+    for column in chunk.columns:
+        rows = np.flatnonzero(rng.random(len(chunk)) < missing_fraction)
+        chunk.loc[rows, column] = np.nan
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Generate synthetic IMS-style 10-minute weather data')
+    parser.add_argument('output_dir', help='Directory for the station CSVs and stations.csv')
+    parser.add_argument('--stations', type=int, default=1, help='Number of stations')
+    parser.add_argument('--years', type=int, default=1, help='Years of data per station')
+    parser.add_argument('--start', default='2000-01-01', help='First day')
+    parser.add_argument('--seed', type=int, default=0, help='Random seed')
+    parser.add_argument('--chunk-days', type=int, default=365, help='Days generated per chunk')
+    parser.add_argument('--gaps', type=float, default=0.0, help='Fraction of rows removed as gaps')
+    parser.add_argument('--duplicates', type=float, default=0.0, help='Fraction of duplicated rows')
+    parser.add_argument('--outliers', type=float, default=0.0, help='Fraction of outlier values')
+    parser.add_argument('--missing', type=float, default=0.0, help='Fraction of empty values')
+    args = parser.parse_args()
+
+    summary = generate_dataset(args.output_dir, n_stations=args.stations, n_years=args.years,
+                               start=args.start, seed=args.seed, chunk_days=args.chunk_days,
+                               gap_fraction=args.gaps, duplicate_fraction=args.duplicates,
+                               outlier_fraction=args.outliers, missing_fraction=args.missing)
+    print(summary.to_string(index=False))
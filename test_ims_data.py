@@ -0,0 +1,132 @@
+"""
+----------------------------------------------------------------------
+Project: Penman Evaporation Calculator
+Filename: test_ims_data
+Author: Roy Elkayam
+Created: 2026-10-17
+Description: Checks of the IMS timestamp parser and the daily aggregation against pandas
+----------------------------------------------------------------------
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+from data_cache import prepare_daily_cached
+from ims_data import (DAILY_AGGREGATIONS, W_M2_TO_MJ_M2_DAY, UnsortedDataError, aggregate_daily_arrays,
+                      data_preparation, find_malformed_ims_datetime, format_ims_datetime, iter_daily_chunks,
+                      parse_ims_datetime)
+
+
+def test_parse_matches_pandas_on_fixed_width_timestamps():
+    timestamps = pd.date_range('1899-12-31 23:50', '2101-01-01', freq='37h13min')
+    values = timestamps.strftime('%d/%m/%Y %H:%M')
+    np.testing.assert_array_equal(parse_ims_datetime(values), timestamps.to_numpy())
+    np.testing.assert_array_equal(format_ims_datetime(timestamps.to_numpy()), values)
+
+
+def test_parse_leap_days():
+    parsed = parse_ims_datetime(['29/02/2020 23:50', '29/02/2000 00:00'])
+    assert list(parsed) == list(pd.to_datetime(['2020-02-29 23:50', '2000-02-29 00:00']).to_numpy())
+    for value in ['29/02/2021 00:00', '29/02/1900 00:00']:
+        with pytest.raises(ValueError):
+            parse_ims_datetime([value])
+
+
+def test_parse_falls_back_for_non_padded_timestamps():
+    parsed = parse_ims_datetime(['01/02/2020 03:05', '1/2/2020 3:05', '10/2/2020 13:5'])
+    assert list(parsed) == list(pd.to_datetime(['2020-02-01 03:05', '2020-02-01 03:05',
+                                                '2020-02-10 13:05']).to_numpy())
+
+
+@pytest.mark.parametrize('value', ['01/02/2020 03:050', '01/02/2020 03:05:00', '01/02/2020 03:05 x',
+                                   '31/04/2020 00:00', '01/13/2020 00:00', '01/02/2020 24:00', 'garbage'])
+def test_parse_rejects_malformed_timestamps(value):
+    with pytest.raises(ValueError):
+        parse_ims_datetime(['01/02/2020 00:00', value])
+
+
+def test_parse_missing_timestamps_as_nat():
+    parsed = parse_ims_datetime(['01/02/2020 00:00', None, np.nan, ''])
+    assert parsed[0] == np.datetime64('2020-02-01T00:00')
+    assert np.isnat(parsed[1:]).all()
+
+
+def test_find_malformed_positions():
+    values = ['01/01/2020 00:00', '29/02/2021 00:00', '1/2/2020 3:05', None, '01/02/2020 03:050', 'x',
+              np.nan, '', '29/02/2020 12:00']
+    np.testing.assert_array_equal(find_malformed_ims_datetime(values), [1, 4, 5])
+    assert find_malformed_ims_datetime(['01/01/2020 00:00']).size == 0
+
+
+def _raw_frame(n_rows=2000, seed=0):
+    """Raw 10-minute observations (IMS layout) with gaps and missing values."""
+    rng = np.random.default_rng(seed)
+    timestamps = pd.date_range('2020-01-01', periods=n_rows, freq='10min')
+    df = pd.DataFrame({name: rng.uniform(0, 30, n_rows) for name in DAILY_AGGREGATIONS})
+    df.insert(0, 'datetime', timestamps.strftime('%d/%m/%Y %H:%M'))
+    df = df.drop(index=range(300, 600)).reset_index(drop=True)  # two missing days
+    for name in DAILY_AGGREGATIONS:
+        df.loc[rng.random(len(df)) < 0.05, name] = np.nan
+    return df
+
+
+def _resample_reference(df):
+    """Daily aggregates of the raw frame computed with DataFrame.resample (the baseline path)."""
+    indexed = df.assign(datetime=pd.to_datetime(df['datetime'], format='%d/%m/%Y %H:%M')).set_index('datetime')
+    return indexed.resample('D').agg(DAILY_AGGREGATIONS)
+
+
+def _assert_matches_resample(df):
+    reference = _resample_reference(df)
+    timestamps = pd.to_datetime(df['datetime'], format='%d/%m/%Y %H:%M').to_numpy()
+    days, daily, _ = aggregate_daily_arrays(timestamps, {name: df[name].to_numpy() for name in DAILY_AGGREGATIONS})
+
+    assert pd.DatetimeIndex(days).equals(pd.DatetimeIndex(reference.index, name=None))
+    for name in DAILY_AGGREGATIONS:
+        np.testing.assert_allclose(daily[name], reference[name].to_numpy(), equal_nan=True)
+
+
+def test_matches_resample():
+    _assert_matches_resample(_raw_frame())
+
+
+def test_matches_resample_on_unsorted_input():
+    df = _raw_frame()
+    _assert_matches_resample(df.sample(frac=1, random_state=1).reset_index(drop=True))
+
+
+def test_matches_resample_with_missing_timestamps():
+    df = _raw_frame()
+    df.loc[[0, 500, len(df) - 1], 'datetime'] = None
+    _assert_matches_resample(df)
+
+
+def test_data_preparation_skips_missing_timestamps():
+    df = pd.DataFrame({
+        'datetime': ['01/01/2020 00:00', None, '02/01/2020 00:10', '01/01/2020 12:00'],
+        'temperature': [10.0, 99.0, 20.0, 12.0],
+        'global_radiation': [0.0, 99.0, 100.0, 200.0],
+        'precipitation': [1.0, 99.0, 0.0, 2.0],
+        'relative_humidity': [50.0, 99.0, 60.0, 70.0],
+        'wind_speed': [1.0, 99.0, 2.0, 3.0],
+    })
+    daily_df = data_preparation(df)
+
+    assert list(daily_df.index) == list(pd.to_datetime(['2020-01-01', '2020-01-02']))
+    np.testing.assert_allclose(daily_df['temperature'], [11.0, 20.0])
+    np.testing.assert_allclose(daily_df['precipitation'], [3.0, 0.0])
+    np.testing.assert_allclose(daily_df['global_radiation'], [100.0 * W_M2_TO_MJ_M2_DAY, 100.0 * W_M2_TO_MJ_M2_DAY])
+    assert list(daily_df['sample_count']) == [2, 1]
+
+
+def test_cached_preparation_handles_out_of_order_rows(tmp_path):
+    df = _raw_frame(n_rows=144 * 10)
+    path = tmp_path / 'rotated.csv'
+    pd.concat([df.iloc[700:], df.iloc[:700]]).to_csv(path, index=False)
+
+    with pytest.raises(UnsortedDataError):
+        list(iter_daily_chunks(path, chunksize=500))
+
+    daily_df = prepare_daily_cached(path, cache_dir=tmp_path / 'cache', chunksize=500)
+    reference = data_preparation(pd.read_csv(path))
+    pd.testing.assert_frame_equal(daily_df, reference, check_freq=False)
@@ -0,0 +1,125 @@
+"""
+----------------------------------------------------------------------
+Project: Penman Evaporation Calculator
+Filename: test_incremental
+Author: Roy Elkayam
+Created: 2026-10-17
+Description: Checks of the incremental mode against a full data_preparation run
+----------------------------------------------------------------------
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+import incremental
+from ims_data import DAILY_AGGREGATIONS, data_preparation
+from penman_calculation import PenmanEvaporation
+from pipeline import RESULT_COLUMNS
+
+PENMAN = PenmanEvaporation(latitude_deg=31.9, elevation=30, albedo=0.08)
+
+
+def _write_source(path, n_rows=144 * 6, seed=0):
+    """Raw IMS CSV with a missing day and missing values; returns its bytes."""
+    rng = np.random.default_rng(seed)
+    timestamps = pd.date_range('2020-01-01', periods=n_rows, freq='10min')
+    df = pd.DataFrame({name: rng.uniform(0, 30, n_rows) for name in DAILY_AGGREGATIONS})
+    df.insert(0, 'datetime', timestamps.strftime('%d/%m/%Y %H:%M'))
+    df = df.drop(index=range(300, 450)).reset_index(drop=True)
+    for name in DAILY_AGGREGATIONS:
+        df.loc[rng.random(len(df)) < 0.05, name] = np.nan
+    df.to_csv(path, index=False)
+    return path.read_bytes()
+
+
+def _reference(path):
+    daily_df = data_preparation(pd.read_csv(path))
+    daily_df['penman_evaporation'] = PENMAN.calculate_daily_evaporation_batch(
+        dates=daily_df.index,
+        t_mean=daily_df['temperature'],
+        rh_mean=daily_df['relative_humidity'],
+        rs=daily_df['global_radiation'],
+        u=daily_df['wind_speed']
+    )
+    return daily_df[list(RESULT_COLUMNS)]
+
+
+def _assert_matches_reference(results_path, source_path):
+    results = pd.read_csv(results_path, index_col=0, parse_dates=True)
+    reference = _reference(source_path)
+    assert not results.index.duplicated().any()
+    assert results.index.equals(pd.DatetimeIndex(reference.index, freq=None))
+    np.testing.assert_allclose(results.to_numpy(dtype=float), reference.to_numpy(dtype=float),
+                               equal_nan=True, rtol=1e-12)
+
+
+def _grow(growing_path, data, cut):
+    with open(growing_path, 'wb') as f:
+        f.write(data[:cut])
+
+
+def _cuts(data):
+    """Cut points inside the header, mid-line, at a line end and inside later days."""
+    line_end = data.index(b'\n', len(data) // 3) + 1
+    return [5, 200, len(data) // 4 + 7, line_end, 2 * len(data) // 3 + 3, len(data)]
+
+
+def test_appends_match_full_run(tmp_path):
+    data = _write_source(tmp_path / 'full.csv')
+    growing, results = tmp_path / 'growing.csv', tmp_path / 'results.csv'
+
+    appended = 0
+    for cut in _cuts(data):
+        _grow(growing, data, cut)
+        appended += len(incremental.update_incremental(str(growing), str(results), PENMAN))
+    assert len(incremental.update_incremental(str(growing), str(results), PENMAN)) == 0  # nothing new
+    appended += len(incremental.update_incremental(str(growing), str(results), PENMAN, close_last_day=True))
+
+    assert appended == len(_reference(growing))
+    _assert_matches_reference(results, growing)
+
+
+def test_open_day_is_carried_over(tmp_path):
+    data = _write_source(tmp_path / 'full.csv')
+    growing, results = tmp_path / 'growing.csv', tmp_path / 'results.csv'
+
+    # Stop in the middle of the second day: only the first day is complete
+    _grow(growing, data, data.index(b'02/01/2020 12:00'))
+    first = incremental.update_incremental(str(growing), str(results), PENMAN)
+    assert list(first.index) == [pd.Timestamp('2020-01-01')]
+
+    _grow(growing, data, len(data))
+    incremental.update_incremental(str(growing), str(results), PENMAN, close_last_day=True)
+    _assert_matches_reference(results, growing)
+
+
+@pytest.mark.parametrize('crash_on_call', [1, 2])
+def test_interrupted_run_is_safe_to_rerun(tmp_path, monkeypatch, crash_on_call):
+    data = _write_source(tmp_path / 'full.csv')
+    growing, results = tmp_path / 'growing.csv', tmp_path / 'results.csv'
+    save_state = incremental._save_state
+    calls = []
+
+    def crash_after_append(state_path, state):
+        # Call 1 of a later run and call 2 of the first run come after the results are appended
+        calls.append(state_path)
+        if len(calls) == crash_on_call:
+            raise RuntimeError('interrupted')
+        save_state(state_path, state)
+
+    cuts = _cuts(data)
+    if crash_on_call == 1:
+        _grow(growing, data, cuts[2])
+        incremental.update_incremental(str(growing), str(results), PENMAN)
+    _grow(growing, data, cuts[4])
+    monkeypatch.setattr(incremental, '_save_state', crash_after_append)
+    with pytest.raises(RuntimeError):
+        incremental.update_incremental(str(growing), str(results), PENMAN)
+    monkeypatch.setattr(incremental, '_save_state', save_state)
+    assert results.exists()  # days were appended before the interruption
+
+    for cut in cuts[4:]:
+        _grow(growing, data, cut)
+        incremental.update_incremental(str(growing), str(results), PENMAN)
+    incremental.update_incremental(str(growing), str(results), PENMAN, close_last_day=True)
+    _assert_matches_reference(results, growing)
@@ -0,0 +1,182 @@
+"""
+----------------------------------------------------------------------
+Project: Penman Evaporation Calculator
+Filename: test_penman_calculation
+Author: Roy Elkayam
+Created: 2026-10-17
+Description: Checks of the vectorized evaporation paths against the scalar calculate_daily_evaporation
+----------------------------------------------------------------------
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+import penman_calculation
+from penman_calculation import (WIND_FUNCTIONS, GridPenmanEvaporation, IncrementalPenmanEvaporation,
+                                MultiStationPenmanEvaporation, PenmanEvaporation)
+
+N_DAYS = 61
+DATES = pd.date_range('2021-01-01', periods=N_DAYS, freq='6D')  # every month of the year
+
+
+def _inputs(shape=(N_DAYS,), seed=0):
+    """Daily met inputs (t_mean, rh_mean, rs in MJ/m²/day, u) over wide ranges, so some days clamp at zero."""
+    rng = np.random.default_rng(seed)
+    return (rng.uniform(0, 35, shape), rng.uniform(20, 100, shape), rng.uniform(1, 32, shape),
+            rng.uniform(0, 6, shape))
+
+
+def _scalar(penman, t_mean, rh_mean, rs, u=None, wind_function='penman1948', dates=DATES):
+    """Reference: one calculate_daily_evaporation call per day (u may be None per day)."""
+    return np.array([penman.calculate_daily_evaporation(
+        date, t_mean[i], rh_mean[i], rs[i], None if u is None else u[i], wind_function)
+        for i, date in enumerate(dates)])
+
+
+def _assert_close(actual, expected):
+    np.testing.assert_allclose(actual, expected, rtol=1e-10, atol=1e-12)
+
+
+BACKENDS = ['numpy', pytest.param('numba', marks=pytest.mark.skipif(
+    penman_calculation.numba is None, reason='Numba is not installed'))]
+
+
+@pytest.mark.parametrize('backend', BACKENDS)
+@pytest.mark.parametrize('wind_function', list(WIND_FUNCTIONS))
+def test_batch_matches_scalar(backend, wind_function):
+    penman = PenmanEvaporation(latitude_deg=31.9, elevation=250, albedo=0.23)
+    t_mean, rh_mean, rs, u = _inputs()
+
+    _assert_close(penman.calculate_daily_evaporation_batch(DATES, t_mean, rh_mean, rs, u, wind_function,
+                                                           backend=backend),
+                  _scalar(penman, t_mean, rh_mean, rs, u, wind_function))
+    _assert_close(penman.calculate_daily_evaporation_batch(DATES, t_mean, rh_mean, rs, backend=backend),
+                  _scalar(penman, t_mean, rh_mean, rs))
+
+
+@pytest.mark.parametrize('backend', BACKENDS)
+def test_batch_accepts_float32_inputs(backend):
+    penman = PenmanEvaporation(latitude_deg=31.9)
+    inputs = [values.astype(np.float32) for values in _inputs()]
+
+    expected = _scalar(penman, *[values.astype(float) for values in inputs])
+    np.testing.assert_allclose(penman.calculate_daily_evaporation_batch(DATES, *inputs, backend=backend),
+                               expected, rtol=1e-6, atol=1e-6)
+
+
+def test_batch_returns_nan_for_missing_inputs():
+    penman = PenmanEvaporation(latitude_deg=31.9)
+    t_mean, rh_mean, rs, u = _inputs()
+    t_mean[3] = np.nan
+
+    result = penman.calculate_daily_evaporation_batch(DATES, t_mean, rh_mean, rs, u)
+    assert np.isnan(result[3]) and np.isfinite(np.delete(result, 3)).all()
+
+
+@pytest.mark.parametrize('backend', BACKENDS)
+def test_multi_station_matches_scalar(backend):
+    latitudes, elevations, albedos = [12.0, 31.9, 31.9, -45.0], [0, 300, -400, 1200], [0.08, 0.23, 0.08, 0.25]
+    t_mean, rh_mean, rs, u = _inputs((len(latitudes), N_DAYS))
+    calculator = MultiStationPenmanEvaporation(latitudes, elevations, albedos)
+
+    result = calculator.calculate_daily_evaporation(DATES, t_mean, rh_mean, rs, u, backend=backend)
+    no_wind = calculator.calculate_daily_evaporation(DATES, t_mean, rh_mean, rs, backend=backend)
+    assert result.shape == (len(latitudes), N_DAYS)
+    for s, station in enumerate(zip(latitudes, elevations, albedos)):
+        penman = PenmanEvaporation(*station)
+        _assert_close(result[s], _scalar(penman, t_mean[s], rh_mean[s], rs[s], u[s]))
+        _assert_close(no_wind[s], _scalar(penman, t_mean[s], rh_mean[s], rs[s]))
+
+
+@pytest.mark.parametrize('backend', BACKENDS)
+def test_grid_with_dem_matches_scalar(backend):
+    latitudes = np.array([10.0, 30.0, 50.0])
+    dem = np.array([[0, 100, 2000, -50], [300, 0, 800, 1500], [10, 20, 30, 40]], dtype=float)
+    t_mean, rh_mean, rs, u = _inputs((N_DAYS,) + dem.shape)
+    calculator = GridPenmanEvaporation(latitudes, elevation=dem, albedo=0.23)
+
+    result = calculator.calculate_daily_evaporation(DATES, t_mean, rh_mean, rs, u, 'penman1956', backend=backend)
+    assert result.shape == t_mean.shape
+    for i, latitude in enumerate(latitudes):
+        for j in range(dem.shape[1]):
+            penman = PenmanEvaporation(latitude, dem[i, j], 0.23)
+            cell = (slice(None), i, j)
+            _assert_close(result[cell], _scalar(penman, t_mean[cell], rh_mean[cell], rs[cell], u[cell],
+                                                'penman1956'))
+
+
+@pytest.mark.parametrize('backend', BACKENDS)
+def test_fallback_matches_scalar_per_day(backend):
+    penman = PenmanEvaporation(latitude_deg=31.9, elevation=30)
+    t_mean, rh_mean, rs, u = _inputs()
+    u[[0, 7, 8, 40]] = np.nan
+
+    result, used_wind = penman.calculate_daily_evaporation_fallback(DATES, t_mean, rh_mean, rs, u,
+                                                                   backend=backend)
+    np.testing.assert_array_equal(used_wind, np.isfinite(u))
+    expected = [penman.calculate_daily_evaporation(date, t_mean[i], rh_mean[i], rs[i],
+                                                   u[i] if np.isfinite(u[i]) else None)
+                for i, date in enumerate(DATES)]
+    _assert_close(result, expected)
+
+
+def test_variants_match_scalar():
+    penman = PenmanEvaporation(latitude_deg=31.9, elevation=100, albedo=0.2)
+    t_mean, rh_mean, rs, u = _inputs()
+
+    variants = penman.calculate_daily_evaporation_variants(DATES, t_mean, rh_mean, rs, u)
+    assert variants.shape == (N_DAYS, len(WIND_FUNCTIONS) + 1)
+    for i, wind_function in enumerate(WIND_FUNCTIONS):
+        _assert_close(variants[:, i], _scalar(penman, t_mean, rh_mean, rs, u, wind_function))
+    _assert_close(variants[:, -1], _scalar(penman, t_mean, rh_mean, rs))
+
+    no_wind = penman.calculate_daily_evaporation_variants(DATES, t_mean, rh_mean, rs)
+    assert no_wind.shape == (N_DAYS, 1)
+    _assert_close(no_wind[:, 0], _scalar(penman, t_mean, rh_mean, rs))
+
+
+def test_sweep_matches_scalar():
+    penman = PenmanEvaporation(latitude_deg=31.9)
+    t_mean, rh_mean, rs, u = _inputs()
+    albedos, elevations, wind_functions = [0.05, 0.08, 0.25], [-400, 0, 1500], ['penman1948', 'linacre1993']
+
+    sweep = penman.calculate_daily_evaporation_sweep(DATES, t_mean, rh_mean, rs, u, albedos, elevations,
+                                                     wind_functions)
+    assert sweep.shape == (len(albedos), len(elevations), len(wind_functions) + 1, N_DAYS)
+    for a, albedo in enumerate(albedos):
+        for e, elevation in enumerate(elevations):
+            point = PenmanEvaporation(31.9, elevation, albedo)
+            for v, wind_function in enumerate(wind_functions):
+                _assert_close(sweep[a, e, v], _scalar(point, t_mean, rh_mean, rs, u, wind_function))
+            _assert_close(sweep[a, e, -1], _scalar(point, t_mean, rh_mean, rs))
+
+    default = penman.calculate_daily_evaporation_sweep(DATES, t_mean, rh_mean, rs)
+    assert default.shape == (1, 1, 1, N_DAYS)
+    _assert_close(default[0, 0, 0], _scalar(penman, t_mean, rh_mean, rs))
+
+
+@pytest.mark.parametrize('use_wind', [True, False])
+def test_incremental_calculator_tracks_changes(use_wind):
+    t_mean, rh_mean, rs, u = _inputs()
+    u = u if use_wind else None
+    calculator = IncrementalPenmanEvaporation(PenmanEvaporation(31.9, 30, 0.08), DATES, t_mean, rh_mean, rs, u)
+    _assert_close(calculator.evaporation, _scalar(PenmanEvaporation(31.9, 30, 0.08), t_mean, rh_mean, rs, u))
+
+    calculator.set_albedo(0.23)
+    _assert_close(calculator.evaporation, _scalar(PenmanEvaporation(31.9, 30, 0.23), t_mean, rh_mean, rs, u))
+    assert calculator.last_recomputed == ['term1', 'evaporation']
+
+    calculator.set_elevation(900)
+    _assert_close(calculator.evaporation, _scalar(PenmanEvaporation(31.9, 900, 0.23), t_mean, rh_mean, rs, u))
+    assert calculator.last_recomputed == ['elevation_correction', 'evaporation']
+
+    calculator.set_wind_function('linacre1993')
+    _assert_close(calculator.evaporation, _scalar(PenmanEvaporation(31.9, 900, 0.23), t_mean, rh_mean, rs, u,
+                                                  'linacre1993'))
+
+    t_mean, rs = t_mean.copy(), rs.copy()
+    t_mean[[2, 5]], rs[[2, 5]] = [4.0, 33.0], [3.0, 28.0]
+    calculator.update_days([2, 5], t_mean=[4.0, 33.0], rs=[3.0, 28.0])
+    _assert_close(calculator.evaporation, _scalar(PenmanEvaporation(31.9, 900, 0.23), t_mean, rh_mean, rs, u,
+                                                  'linacre1993'))
+    assert 'elevation_correction' not in calculator.last_recomputed
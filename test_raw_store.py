@@ -0,0 +1,55 @@
+"""
+----------------------------------------------------------------------
+Project: Penman Evaporation Calculator
+Filename: test_raw_store
+Author: Roy Elkayam
+Created: 2026-10-17
+Description: Round-trip and range selection checks of the binary raw store
+----------------------------------------------------------------------
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+from ims_data import DAILY_AGGREGATIONS
+from raw_store import RawStore, append_raw_store, convert_csv_to_store, create_raw_store
+
+
+def _write_csv(path, stamps):
+    df = pd.DataFrame({'datetime': stamps})
+    for i, name in enumerate(DAILY_AGGREGATIONS):
+        df[name] = np.arange(len(stamps), dtype=float) + 10 * i
+    df.to_csv(path, index=False)
+    return df
+
+
+def test_round_trip_and_slice_skip_missing_timestamps(tmp_path):
+    csv_path, store_path = tmp_path / 'raw.csv', tmp_path / 'raw.bin'
+    df = _write_csv(csv_path, ['01/01/2020 00:00', '01/01/2020 00:10', '01/01/2020 00:30', None,
+                               '01/01/2020 00:40'])
+
+    assert convert_csv_to_store(csv_path, store_path, chunksize=2) == 4
+    store = RawStore(store_path)
+    expected = pd.to_datetime(df['datetime'].dropna(), format='%d/%m/%Y %H:%M').to_numpy()
+    np.testing.assert_array_equal(store.timestamps, expected)
+    np.testing.assert_array_equal(store.records['temperature'], df['temperature'].drop(index=3))
+
+    assert len(store.slice(None, '2020-01-01 00:35')) == 3
+    assert len(store.slice('2020-01-01 00:10', '2020-01-01 00:40')) == 2
+    frame = store.to_frame('2020-01-01 00:30')
+    assert list(frame['datetime']) == list(pd.to_datetime(['2020-01-01 00:30', '2020-01-01 00:40']))
+
+
+def test_append_sorts_rows_and_rejects_earlier_rows(tmp_path):
+    store_path = tmp_path / 'raw.bin'
+    create_raw_store(store_path)
+    rows = {name: [1.0, 2.0] for name in DAILY_AGGREGATIONS}
+    append_raw_store(store_path, pd.DataFrame({'datetime': ['01/01/2020 00:10', '01/01/2020 00:00'], **rows}))
+
+    store = RawStore(store_path)
+    assert list(store.records['temperature']) == [2.0, 1.0]
+    assert store.last_timestamp() == pd.Timestamp('2020-01-01 00:10').value
+    del store
+
+    with pytest.raises(ValueError):
+        append_raw_store(store_path, pd.DataFrame({'datetime': ['01/01/2020 00:05', None], **rows}))
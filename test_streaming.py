@@ -0,0 +1,103 @@
+"""
+----------------------------------------------------------------------
+Project: Penman Evaporation Calculator
+Filename: test_streaming
+Author: Roy Elkayam
+Created: 2026-10-17
+Description: Replay checks of the streaming engine against run_pipeline
+----------------------------------------------------------------------
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+from ims_data import DAILY_AGGREGATIONS, parse_ims_datetime
+from penman_calculation import PenmanEvaporation
+from pipeline import RESULT_COLUMNS, run_pipeline
+from streaming import FileTailAdapter, StreamingEvaporationEngine
+
+PENMAN = PenmanEvaporation(latitude_deg=31.9, elevation=30, albedo=0.08)
+N_DUPLICATES = 5
+
+
+def _raw_frame(n_rows=144 * 8, seed=0):
+    """Raw observations with two days without any record and missing values."""
+    rng = np.random.default_rng(seed)
+    timestamps = pd.date_range('2020-01-01', periods=n_rows, freq='10min')
+    df = pd.DataFrame({name: rng.uniform(0, 30, n_rows) for name in DAILY_AGGREGATIONS})
+    df.insert(0, 'datetime', timestamps.strftime('%d/%m/%Y %H:%M'))
+    df = df.drop(index=range(144 * 3, 144 * 5)).reset_index(drop=True)
+    for name in DAILY_AGGREGATIONS:
+        df.loc[rng.random(len(df)) < 0.05, name] = np.nan
+    return df
+
+
+def _with_duplicates(df):
+    """Repeat a few timestamps right after the originals, with different values (late corrections)."""
+    rows = df.iloc[np.linspace(10, len(df) - 10, N_DUPLICATES).astype(int)]
+    duplicates = rows.assign(**{name: rows[name] + 1 for name in DAILY_AGGREGATIONS})
+    return pd.concat([df, duplicates]).sort_index(kind='stable').reset_index(drop=True)
+
+
+def _results_frame(results):
+    df = pd.DataFrame([result.to_dict() for result in results])
+    df.index = pd.DatetimeIndex(pd.to_datetime(df.pop('date')), name='datetime')
+    assert not df['provisional'].any()
+    return df[list(RESULT_COLUMNS)]
+
+
+def _push_records(engine, df):
+    timestamps = parse_ims_datetime(df['datetime'])
+    results = []
+    for i in range(len(df)):
+        results += engine.push('s', timestamps[i], {name: df[name].iat[i] for name in DAILY_AGGREGATIONS})
+    return results + engine.flush()
+
+
+def _push_batches(engine, df):
+    timestamps = parse_ims_datetime(df['datetime'])
+    cuts = np.sort(np.random.default_rng(1).integers(0, len(df), 12))
+    results = []
+    for lo, hi in zip([0, *cuts], [*cuts, len(df)]):
+        results += engine.push_batch('s', timestamps[lo:hi], {name: df[name].to_numpy()[lo:hi]
+                                                               for name in DAILY_AGGREGATIONS})
+    return results + engine.flush()
+
+
+@pytest.mark.parametrize('replay', [_push_records, _push_batches])
+def test_replay_matches_run_pipeline_days_with_samples(tmp_path, replay):
+    path = tmp_path / 'station.csv'
+    df = _raw_frame()
+    df.to_csv(path, index=False)
+    reference = run_pipeline(str(path), PENMAN, output_columns=RESULT_COLUMNS)
+
+    results = _results_frame(replay(StreamingEvaporationEngine({'s': PENMAN}), df))
+
+    # Days without records (sample_count 0 in run_pipeline) are not reported by the engine
+    assert (reference['sample_count'] == 0).sum() == 2
+    expected = reference[reference['sample_count'] > 0]
+    assert results.index.equals(pd.DatetimeIndex(expected.index, freq=None))
+    np.testing.assert_allclose(results.to_numpy(dtype=float), expected.to_numpy(dtype=float),
+                               equal_nan=True, rtol=1e-12)
+
+
+def test_file_replay_drops_repeated_timestamps(tmp_path):
+    clean_path, path = tmp_path / 'clean.csv', tmp_path / 'station.csv'
+    df = _raw_frame()
+    df.to_csv(clean_path, index=False)
+    _with_duplicates(df).to_csv(path, index=False)
+
+    engine = StreamingEvaporationEngine({'s': PENMAN})
+    with FileTailAdapter(str(path), 's', poll_interval=0, idle_timeout=0, block_size=4096) as feed:
+        results = _results_frame(engine.consume(feed, flush=True))
+
+    # The engine keeps the first record of a repeated timestamp, as if the copies were absent...
+    assert engine.accumulators['s'].n_dropped == N_DUPLICATES
+    expected = run_pipeline(str(clean_path), PENMAN, output_columns=RESULT_COLUMNS)
+    expected = expected[expected['sample_count'] > 0]
+    np.testing.assert_allclose(results.to_numpy(dtype=float), expected.to_numpy(dtype=float),
+                               equal_nan=True, rtol=1e-12)
+
+    # ...while run_pipeline counts every row
+    with_copies = run_pipeline(str(path), PENMAN, output_columns=RESULT_COLUMNS)
+    assert with_copies['sample_count'].sum() == results['sample_count'].sum() + N_DUPLICATES